@@ -1,6 +1,6 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
@@ -17,6 +17,27 @@ class BenGrahamSignal(BaseModel):
     reasoning: str
 
 
+LINE_ITEMS = [
+    "earnings_per_share",
+    "revenue",
+    "net_income",
+    "book_value_per_share",
+    "total_assets",
+    "total_liabilities",
+    "current_assets",
+    "current_liabilities",
+    "dividends_and_other_cash_distributions",
+    "outstanding_shares",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "annual", "limit": 10},
+    "line_items": {"line_items": LINE_ITEMS, "period": "annual", "limit": 10},
+    "market_cap": {},
+}
+
+
 def ben_graham_agent(state: AgentState):
     """
     Analyzes stocks using Benjamin Graham's classic value-investing principles:
@@ -32,12 +53,15 @@ def ben_graham_agent(state: AgentState):
     analysis_data = {}
     graham_analysis = {}
 
+    progress.update_status("ben_graham_agent", None, "Gathering financial line items")
+    # Fetch line items for all tickers in one batched request
+    line_items_by_ticker = search_line_items_batch(tickers, end_date=end_date, **DATA_REQUIREMENTS["line_items"])
+
     for ticker in tickers:
         progress.update_status("ben_graham_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)
+        metrics = get_financial_metrics(ticker, end_date, **DATA_REQUIREMENTS["financial_metrics"])
 
-        progress.update_status("ben_graham_agent", ticker, "Gathering financial line items")
-        financial_line_items = search_line_items(ticker, ["earnings_per_share", "revenue", "net_income", "book_value_per_share", "total_assets", "total_liabilities", "current_assets", "current_liabilities", "dividends_and_other_cash_distributions", "outstanding_shares"], end_date, period="annual", limit=10)
+        financial_line_items = line_items_by_ticker[ticker]
 
         progress.update_status("ben_graham_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
@@ -1,6 +1,6 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
@@ -15,6 +15,25 @@ class BillAckmanSignal(BaseModel):
     reasoning: str
 
 
+LINE_ITEMS = [
+    "revenue",
+    "operating_margin",
+    "debt_to_equity",
+    "free_cash_flow",
+    "total_assets",
+    "total_liabilities",
+    "dividends_and_other_cash_distributions",
+    "outstanding_shares",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "annual", "limit": 5},
+    "line_items": {"line_items": LINE_ITEMS, "period": "annual", "limit": 5},
+    "market_cap": {},
+}
+
+
 def bill_ackman_agent(state: AgentState):
     """
     Analyzes stocks using Bill Ackman's investing principles and LLM reasoning.
@@ -27,29 +46,16 @@ def bill_ackman_agent(state: AgentState):
     analysis_data = {}
     ackman_analysis = {}
     
+    progress.update_status("bill_ackman_agent", None, "Gathering financial line items")
+    # Request multiple periods of data (annual or TTM) for a more robust long-term view, in one batched request for all tickers
+    line_items_by_ticker = search_line_items_batch(tickers, end_date=end_date, **DATA_REQUIREMENTS["line_items"])
+
     for ticker in tickers:
         progress.update_status("bill_ackman_agent", ticker, "Fetching financial metrics")
         # You can adjust these parameters (period="annual"/"ttm", limit=5/10, etc.)
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
+        metrics = get_financial_metrics(ticker, end_date, **DATA_REQUIREMENTS["financial_metrics"])
         
-        progress.update_status("bill_ackman_agent", ticker, "Gathering financial line items")
-        # Request multiple periods of data (annual or TTM) for a more robust long-term view.
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "operating_margin",
-                "debt_to_equity",
-                "free_cash_flow",
-                "total_assets",
-                "total_liabilities",
-                "dividends_and_other_cash_distributions",
-                "outstanding_shares"
-            ],
-            end_date,
-            period="annual",  # or "ttm" if you prefer trailing 12 months
-            limit=5           # fetch up to 5 annual periods (or more if needed)
-        )
+        financial_line_items = line_items_by_ticker[ticker]
         
         progress.update_status("bill_ackman_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
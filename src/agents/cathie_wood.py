@@ -1,6 +1,6 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
@@ -15,6 +15,29 @@ class CathieWoodSignal(BaseModel):
     reasoning: str
 
 
+LINE_ITEMS = [
+    "revenue",
+    "gross_margin",
+    "operating_margin",
+    "debt_to_equity",
+    "free_cash_flow",
+    "total_assets",
+    "total_liabilities",
+    "dividends_and_other_cash_distributions",
+    "outstanding_shares",
+    "research_and_development",
+    "capital_expenditure",
+    "operating_expense",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "annual", "limit": 5},
+    "line_items": {"line_items": LINE_ITEMS, "period": "annual", "limit": 5},
+    "market_cap": {},
+}
+
+
 def cathie_wood_agent(state: AgentState):
     """
     Analyzes stocks using Cathie Wood's investing principles and LLM reasoning.
@@ -30,34 +53,16 @@ def cathie_wood_agent(state: AgentState):
     analysis_data = {}
     cw_analysis = {}
 
+    progress.update_status("cathie_wood_agent", None, "Gathering financial line items")
+    # Request multiple periods of data (annual or TTM) for a more robust view, in one batched request for all tickers
+    line_items_by_ticker = search_line_items_batch(tickers, end_date=end_date, **DATA_REQUIREMENTS["line_items"])
+
     for ticker in tickers:
         progress.update_status("cathie_wood_agent", ticker, "Fetching financial metrics")
         # You can adjust these parameters (period="annual"/"ttm", limit=5/10, etc.)
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
-
-        progress.update_status("cathie_wood_agent", ticker, "Gathering financial line items")
-        # Request multiple periods of data (annual or TTM) for a more robust view.
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "gross_margin",
-                "operating_margin",
-                "debt_to_equity",
-                "free_cash_flow",
-                "total_assets",
-                "total_liabilities",
-                "dividends_and_other_cash_distributions",
-                "outstanding_shares",
-                "research_and_development",
-                "capital_expenditure",
-                "operating_expense",
-
-            ],
-            end_date,
-            period="annual",
-            limit=5
-        )
+        metrics = get_financial_metrics(ticker, end_date, **DATA_REQUIREMENTS["financial_metrics"])
+
+        financial_line_items = line_items_by_ticker[ticker]
 
         progress.update_status("cathie_wood_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
@@ -1,6 +1,6 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items, get_insider_trades, get_company_news
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch, get_insider_trades, get_company_news
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
@@ -15,6 +15,33 @@ class CharlieMungerSignal(BaseModel):
     reasoning: str
 
 
+LINE_ITEMS = [
+    "revenue",
+    "net_income",
+    "operating_income",
+    "return_on_invested_capital",
+    "gross_margin",
+    "operating_margin",
+    "free_cash_flow",
+    "capital_expenditure",
+    "cash_and_equivalents",
+    "total_debt",
+    "shareholders_equity",
+    "outstanding_shares",
+    "research_and_development",
+    "goodwill_and_intangible_assets",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "annual", "limit": 10},
+    "line_items": {"line_items": LINE_ITEMS, "period": "annual", "limit": 10},
+    "market_cap": {},
+    "insider_trades": {"limit": 100},
+    "company_news": {"limit": 100},
+}
+
+
 def charlie_munger_agent(state: AgentState):
     """
     Analyzes stocks using Charlie Munger's investing principles and mental models.
@@ -27,33 +54,16 @@ def charlie_munger_agent(state: AgentState):
     analysis_data = {}
     munger_analysis = {}
     
+    progress.update_status("charlie_munger_agent", None, "Gathering financial line items")
+    # Fetch line items for all tickers in one batched request
+    # Munger examines long-term trends
+    line_items_by_ticker = search_line_items_batch(tickers, end_date=end_date, **DATA_REQUIREMENTS["line_items"])
+
     for ticker in tickers:
         progress.update_status("charlie_munger_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)  # Munger looks at longer periods
+        metrics = get_financial_metrics(ticker, end_date, **DATA_REQUIREMENTS["financial_metrics"])  # Munger looks at longer periods
         
-        progress.update_status("charlie_munger_agent", ticker, "Gathering financial line items")
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "net_income",
-                "operating_income",
-                "return_on_invested_capital",
-                "gross_margin",
-                "operating_margin",
-                "free_cash_flow",
-                "capital_expenditure",
-                "cash_and_equivalents",
-                "total_debt",
-                "shareholders_equity",
-                "outstanding_shares",
-                "research_and_development",
-                "goodwill_and_intangible_assets",
-            ],
-            end_date,
-            period="annual",
-            limit=10  # Munger examines long-term trends
-        )
+        financial_line_items = line_items_by_ticker[ticker]
         
         progress.update_status("charlie_munger_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
@@ -65,7 +75,7 @@ def charlie_munger_agent(state: AgentState):
             end_date,
             # Look back 2 years for insider trading patterns
             start_date=None,
-            limit=100
+            limit=DATA_REQUIREMENTS["insider_trades"]["limit"],
         )
         
         progress.update_status("charlie_munger_agent", ticker, "Fetching company news")
@@ -75,7 +85,7 @@ def charlie_munger_agent(state: AgentState):
             end_date,
             # Look back 1 year for news
             start_date=None,
-            limit=100
+            limit=DATA_REQUIREMENTS["company_news"]["limit"],
         )
         
         progress.update_status("charlie_munger_agent", ticker, "Analyzing moat strength")
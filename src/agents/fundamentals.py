@@ -6,6 +6,12 @@ import json
 from tools.api import get_financial_metrics
 
 
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "ttm", "limit": 10},
+}
+
+
 ##### Fundamental Agent #####
 def fundamentals_agent(state: AgentState):
     """Analyzes fundamental data and generates trading signals for multiple tickers."""
@@ -23,8 +29,7 @@ def fundamentals_agent(state: AgentState):
         financial_metrics = get_financial_metrics(
             ticker=ticker,
             end_date=end_date,
-            period="ttm",
-            limit=10,
+            **DATA_REQUIREMENTS["financial_metrics"],
         )
 
         if not financial_metrics:
@@ -1,13 +1,20 @@
 from langchain_core.messages import HumanMessage
 from graph.state import AgentState, show_agent_reasoning
 from utils.progress import progress
-import pandas as pd
-import numpy as np
 import json
+import math
+from collections import Counter
 
 from tools.api import get_insider_trades, get_company_news
 
 
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "insider_trades": {"limit": 1000},
+    "company_news": {"limit": 100},
+}
+
+
 ##### Sentiment Agent #####
 def sentiment_agent(state: AgentState):
     """Analyzes market sentiment and generates trading signals for multiple tickers."""
@@ -19,30 +26,21 @@ def sentiment_agent(state: AgentState):
     sentiment_analysis = {}
 
     for ticker in tickers:
-        progress.update_status("sentiment_agent", ticker, "Fetching insider trades")
-
-        # Get the insider trades
-        insider_trades = get_insider_trades(
-            ticker=ticker,
-            end_date=end_date,
-            limit=1000,
-        )
-
-        progress.update_status("sentiment_agent", ticker, "Analyzing trading patterns")
-
-        # Get the signals from the insider trades
-        transaction_shares = pd.Series([t.transaction_shares for t in insider_trades]).dropna()
-        insider_signals = np.where(transaction_shares < 0, "bearish", "bullish").tolist()
+        progress.update_status("sentiment_agent", ticker, "Analyzing insider trades")
 
-        progress.update_status("sentiment_agent", ticker, "Fetching company news")
+        # Count the signals from the insider trades, without building a frame of them
+        insider_signals = Counter()
+        for trade in get_insider_trades(ticker=ticker, end_date=end_date, limit=DATA_REQUIREMENTS["insider_trades"]["limit"]):
+            if trade.transaction_shares is not None and not math.isnan(trade.transaction_shares):
+                insider_signals["bearish" if trade.transaction_shares < 0 else "bullish"] += 1
 
-        # Get the company news
-        company_news = get_company_news(ticker, end_date, limit=100)
+        progress.update_status("sentiment_agent", ticker, "Analyzing company news")
 
-        # Get the sentiment from the company news
-        sentiment = pd.Series([n.sentiment for n in company_news]).dropna()
-        news_signals = np.where(sentiment == "negative", "bearish", 
-                              np.where(sentiment == "positive", "bullish", "neutral")).tolist()
+        # Count the sentiment of the company news the same way
+        news_signals = Counter()
+        for news in get_company_news(ticker, end_date, limit=DATA_REQUIREMENTS["company_news"]["limit"]):
+            if news.sentiment is not None:
+                news_signals[{"negative": "bearish", "positive": "bullish"}.get(news.sentiment, "neutral")] += 1
         
         progress.update_status("sentiment_agent", ticker, "Combining signals")
         # Combine signals from both sources with weights
@@ -51,12 +49,12 @@ def sentiment_agent(state: AgentState):
         
         # Calculate weighted signal counts
         bullish_signals = (
-            insider_signals.count("bullish") * insider_weight +
-            news_signals.count("bullish") * news_weight
+            insider_signals["bullish"] * insider_weight +
+            news_signals["bullish"] * news_weight
         )
         bearish_signals = (
-            insider_signals.count("bearish") * insider_weight +
-            news_signals.count("bearish") * news_weight
+            insider_signals["bearish"] * insider_weight +
+            news_signals["bearish"] * news_weight
         )
 
         if bullish_signals > bearish_signals:
@@ -67,7 +65,7 @@ def sentiment_agent(state: AgentState):
             overall_signal = "neutral"
 
         # Calculate confidence level based on the weighted proportion
-        total_weighted_signals = len(insider_signals) * insider_weight + len(news_signals) * news_weight
+        total_weighted_signals = sum(insider_signals.values()) * insider_weight + sum(news_signals.values()) * news_weight
         confidence = 0  # Default confidence when there are no signals
         if total_weighted_signals > 0:
             confidence = round(max(bullish_signals, bearish_signals) / total_weighted_signals, 2) * 100
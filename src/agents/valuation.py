@@ -3,7 +3,23 @@ from graph.state import AgentState, show_agent_reasoning
 from utils.progress import progress
 import json
 
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch
+
+
+LINE_ITEMS = [
+    "free_cash_flow",
+    "net_income",
+    "depreciation_and_amortization",
+    "capital_expenditure",
+    "working_capital",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "ttm", "limit": 10},
+    "line_items": {"line_items": LINE_ITEMS, "period": "ttm", "limit": 2},
+    "market_cap": {},
+}
 
 
 ##### Valuation Agent #####
@@ -16,6 +32,14 @@ def valuation_agent(state: AgentState):
     # Initialize valuation analysis for each ticker
     valuation_analysis = {}
 
+    progress.update_status("valuation_agent", None, "Gathering financial line items")
+    # Fetch the specific line_items that we need for valuation purposes, in one batched request for all tickers
+    line_items_by_ticker = search_line_items_batch(
+        tickers=tickers,
+        end_date=end_date,
+        **DATA_REQUIREMENTS["line_items"],
+    )
+
     for ticker in tickers:
         progress.update_status("valuation_agent", ticker, "Fetching financial data")
 
@@ -23,7 +47,7 @@ def valuation_agent(state: AgentState):
         financial_metrics = get_financial_metrics(
             ticker=ticker,
             end_date=end_date,
-            period="ttm",
+            **DATA_REQUIREMENTS["financial_metrics"],
         )
 
         # Add safety check for financial metrics
@@ -33,21 +57,7 @@ def valuation_agent(state: AgentState):
         
         metrics = financial_metrics[0]
 
-        progress.update_status("valuation_agent", ticker, "Gathering line items")
-        # Fetch the specific line_items that we need for valuation purposes
-        financial_line_items = search_line_items(
-            ticker=ticker,
-            line_items=[
-                "free_cash_flow",
-                "net_income",
-                "depreciation_and_amortization",
-                "capital_expenditure",
-                "working_capital",
-            ],
-            end_date=end_date,
-            period="ttm",
-            limit=2,
-        )
+        financial_line_items = line_items_by_ticker[ticker]
 
         # Add safety check for financial line items
         if len(financial_line_items) < 2:
@@ -4,7 +4,7 @@ from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
+from tools.api import get_financial_metrics, get_market_cap, search_line_items_batch
 from utils.llm import call_llm
 from utils.progress import progress
 
@@ -15,6 +15,23 @@ class WarrenBuffettSignal(BaseModel):
     reasoning: str
 
 
+LINE_ITEMS = [
+    "capital_expenditure",
+    "depreciation_and_amortization",
+    "net_income",
+    "outstanding_shares",
+    "total_assets",
+    "total_liabilities",
+]
+
+# Data this agent fetches, see tools.planner
+DATA_REQUIREMENTS = {
+    "financial_metrics": {"period": "ttm", "limit": 5},
+    "line_items": {"line_items": LINE_ITEMS, "period": "ttm", "limit": 5},
+    "market_cap": {},
+}
+
+
 def warren_buffett_agent(state: AgentState):
     """Analyzes stocks using Buffett's principles and LLM reasoning."""
     data = state["data"]
@@ -25,26 +42,16 @@ def warren_buffett_agent(state: AgentState):
     analysis_data = {}
     buffett_analysis = {}
 
+    progress.update_status("warren_buffett_agent", None, "Gathering financial line items")
+    # Fetch line items for all tickers in one batched request
+    line_items_by_ticker = search_line_items_batch(tickers, end_date=end_date, **DATA_REQUIREMENTS["line_items"])
+
     for ticker in tickers:
         progress.update_status("warren_buffett_agent", ticker, "Fetching financial metrics")
         # Fetch required data
-        metrics = get_financial_metrics(ticker, end_date, period="ttm", limit=5)
-
-        progress.update_status("warren_buffett_agent", ticker, "Gathering financial line items")
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "capital_expenditure",
-                "depreciation_and_amortization",
-                "net_income",
-                "outstanding_shares",
-                "total_assets",
-                "total_liabilities",
-            ],
-            end_date,
-            period="ttm",
-            limit=5,
-        )
+        metrics = get_financial_metrics(ticker, end_date, **DATA_REQUIREMENTS["financial_metrics"])
+
+        financial_line_items = line_items_by_ticker[ticker]
 
         progress.update_status("warren_buffett_agent", ticker, "Getting market cap")
         # Get current market cap
@@ -35,6 +35,7 @@ from tools.api import (
     get_financial_metrics,
     get_insider_trades,
 )
+from tools.planner import plan_requests, prefetch_plan
 from utils.display import print_backtest_results, format_backtest_row
 from utils.helper import get_agent_name, agent_mapper, portfolio_summary_computation
 import numpy as np
@@ -307,18 +308,15 @@ class Backtester:
         start_date_dt = end_date_dt - relativedelta(years=1)
         start_date_str = start_date_dt.strftime("%Y-%m-%d")
 
-        for ticker in self.tickers:
-            # Fetch price data for the entire period, plus 1 year
-            get_prices(ticker, start_date_str, self.end_date)
-
-            # Fetch financial metrics
-            get_financial_metrics(ticker, self.end_date, limit=10)
+        # Fetch what the selected analysts need for the whole backtest in one deduplicated set of
+        # concurrent requests: prices from 1 year back, and financial metrics as of every trading day
+        plan = plan_requests(self.tickers, self.selected_analysts, start_date_str, self.end_date, as_of_start_date=self.start_date)
+        results = prefetch_plan(plan)
 
-            # Fetch insider trades
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000)
-
-            # Fetch company news
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000)
+        for ticker, endpoints in results.items():
+            for endpoint, result in endpoints.items():
+                if isinstance(result, Exception):
+                    print(f"Error pre-fetching {endpoint} for {ticker}: {result}")
 
         print("Data pre-fetch complete.")
 
@@ -707,6 +705,10 @@ def run_hedge_fund(
         else:
             agent = app
 
+        # Fetch what the selected analysts need up front as one deduplicated set of requests.
+        # Failures are left to the agents, which retry the fetch and report the error themselves.
+        prefetch_plan(plan_requests(tickers, selected_analysts, start_date, end_date))
+
         final_state = agent.invoke(
             {
                 "messages": [
@@ -0,0 +1,352 @@
+"""
+A local stand-in for the financialdatasets.ai API, serving /prices/, /financial-metrics/,
+/financials/search/line-items, /insider-trades/ and /news/ in the shapes of data/models.py.
+Data is synthetic and deterministic per ticker and date, or replayed from a fixture store
+recorded with FINANCIAL_DATASETS_FIXTURE_MODE=record. Latency, a request-per-minute limit and
+random 429s can be configured. Run from src/:
+
+    python -m benchmarks.api_server [--port 8765] [--latency 0.05] [--rate-limit 600] [--error-rate 0.02]
+
+then point the client at it with FINANCIAL_DATASETS_BASE_URL=http://127.0.0.1:8765.
+GET /_stats returns how many requests were served and rejected.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from data.models import FinancialMetrics
+from tools.fixtures import FixtureStore
+
+# Earliest date synthetic histories go back to
+HISTORY_START = date(2000, 1, 1)
+
+
+def _seed(*parts) -> int:
+    """A stable number for a ticker and date, so every request sees the same synthetic history."""
+    return zlib.crc32("|".join(map(str, parts)).encode())
+
+
+def _unit(*parts) -> float:
+    """A stable value in [0, 1) for a ticker and date."""
+    return _seed(*parts) / 2**32
+
+
+def synthetic_prices(ticker: str, start_date: str, end_date: str) -> list[dict]:
+    """Weekday bars on a smooth, ticker-specific curve, oldest first."""
+    base = 20 + 480 * _unit(ticker)
+    day, end = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+    prices = []
+    while day <= end:
+        if day.weekday() < 5:
+            close = base * (1 + 0.3 * math.sin(day.toordinal() / 40 + _unit(ticker, "phase") * 6))
+            spread = close * 0.02 * _unit(ticker, day)
+            prices.append(
+                {
+                    "open": round(close - spread / 2, 2),
+                    "close": round(close, 2),
+                    "high": round(close + spread, 2),
+                    "low": round(close - spread, 2),
+                    "volume": 1_000_000 + _seed(ticker, day, "volume") % 9_000_000,
+                    "time": f"{day.isoformat()}T00:00:00Z",
+                }
+            )
+        day += timedelta(days=1)
+    return prices
+
+
+def report_periods(end_date: str, period: str, limit: int) -> list[str]:
+    """The latest `limit` quarter or year ends on or before end_date, newest first."""
+    end = date.fromisoformat(end_date[:10])
+    periods = []
+    year, quarter = end.year, 4
+    while len(periods) < limit and year >= HISTORY_START.year:
+        month = quarter * 3
+        last_day = date(year, month, 30 if month in (6, 9) else 31)
+        if last_day <= end and (period != "annual" or quarter == 4):
+            periods.append(last_day.isoformat())
+        quarter -= 1
+        if quarter == 0:
+            year, quarter = year - 1, 4
+    return periods
+
+
+def synthetic_financial_metrics(ticker: str, end_date: str, period: str, limit: int) -> list[dict]:
+    fields = [name for name in FinancialMetrics.model_fields if name not in ("ticker", "report_period", "period", "currency")]
+    return [
+        {
+            "ticker": ticker,
+            "report_period": report_period,
+            "period": period,
+            "currency": "USD",
+            **{field: round(_unit(ticker, report_period, field) * (1e12 if field in ("market_cap", "enterprise_value") else 2), 4) for field in fields},
+        }
+        for report_period in report_periods(end_date, period, limit)
+    ]
+
+
+def synthetic_line_items(tickers: list[str], line_items: list[str], end_date: str, period: str, limit: int) -> list[dict]:
+    """Up to `limit` rows in total, split evenly between the tickers, newest first per ticker."""
+    per_ticker = max(1, limit // max(1, len(tickers)))
+    return [
+        {
+            "ticker": ticker,
+            "report_period": report_period,
+            "period": period,
+            "currency": "USD",
+            **{line_item: round(_unit(ticker, report_period, line_item) * 1e10, 2) for line_item in line_items},
+        }
+        for ticker in tickers
+        for report_period in report_periods(end_date, period, per_ticker)
+    ]
+
+
+def _days_back(end_date: str, start_date: str | None):
+    """Days from end_date back to start_date, or to HISTORY_START, newest first."""
+    day, start = date.fromisoformat(end_date[:10]), date.fromisoformat(start_date[:10]) if start_date else HISTORY_START
+    while day >= start:
+        yield day
+        day -= timedelta(days=1)
+
+
+def synthetic_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+    """About one filing every three days, newest first."""
+    trades = []
+    for day in _days_back(end_date, start_date):
+        if len(trades) >= limit:
+            break
+        if _seed(ticker, day, "filing") % 3:
+            continue
+        shares = (_seed(ticker, day, "shares") % 20_000) - 10_000
+        price = round(20 + 480 * _unit(ticker, day, "price"), 2)
+        before = 100_000 + _seed(ticker, day, "owned") % 1_000_000
+        trades.append(
+            {
+                "ticker": ticker,
+                "issuer": f"{ticker} Inc",
+                "name": f"Insider {_seed(ticker, day, 'name') % 12}",
+                "title": "Director",
+                "is_board_director": True,
+                "transaction_date": (day - timedelta(days=2)).isoformat(),
+                "transaction_shares": float(shares),
+                "transaction_price_per_share": price,
+                "transaction_value": round(shares * price, 2),
+                "shares_owned_before_transaction": float(before),
+                "shares_owned_after_transaction": float(before + shares),
+                "security_title": "Common Stock",
+                "filing_date": day.isoformat(),
+            }
+        )
+    return trades
+
+
+def synthetic_company_news(ticker: str, end_date: str, start_date: str | None, limit: int, per_day: int = 3) -> list[dict]:
+    """per_day articles a day, newest first."""
+    news = []
+    for day in _days_back(end_date, start_date):
+        for i in reversed(range(per_day)):
+            if len(news) >= limit:
+                return news
+            news.append(
+                {
+                    "ticker": ticker,
+                    "title": f"{ticker} headline {day.isoformat()} #{i}",
+                    "author": "Staff",
+                    "source": "Synthetic Wire",
+                    "date": f"{day.isoformat()}T{9 + i:02d}:00:00Z",
+                    "url": f"https://news.example.com/{ticker}/{day.isoformat()}/{i}",
+                    "sentiment": ("positive", "negative", "neutral")[_seed(ticker, day, i) % 3],
+                }
+            )
+    return news
+
+
+class TokenBucket:
+    """Allows `rate` requests per minute with bursts of up to `burst`, shared by every handler thread."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate / 60
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token and return 0, or return how many seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class APIServer(ThreadingHTTPServer):
+    """A ThreadingHTTPServer holding the stand-in's configuration and request counters."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: float | None = None,
+        burst: float | None = None,
+        error_rate: float = 0.0,
+        fixtures: str | None = None,
+    ):
+        """
+        :param latency: Seconds added to every response.
+        :param jitter: Up to this many extra seconds, drawn uniformly per response.
+        :param rate_limit: Requests per minute before 429s are returned, unlimited if None.
+        :param burst: Requests allowed at once under the rate limit; defaults to one second's worth.
+        :param error_rate: Fraction of requests answered with a 429 regardless of the limit.
+        :param fixtures: Fixture store to serve recorded responses from, falling back to synthetic data.
+        """
+        super().__init__(address, Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket = TokenBucket(rate_limit, burst or max(1.0, rate_limit / 60)) if rate_limit else None
+        self.error_rate = error_rate
+        self.fixtures = FixtureStore(fixtures) if fixtures else None
+        self.stats = {"requests": 0, "served": 0, "rate_limited": 0, "injected_429": 0, "replayed": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, **increments: int):
+        with self._stats_lock:
+            for name, increment in increments.items():
+                self.stats[name] += increment
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: APIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict, headers: dict[str, str] | None = None):
+        self._send(status, json.dumps(payload).encode(), headers)
+
+    def _throttled(self) -> bool:
+        """Answer with a 429 if the rate limit is exhausted or one is injected."""
+        server = self.server
+        server.count(requests=1)
+        if server.bucket is not None and (wait := server.bucket.acquire()) > 0:
+            server.count(rate_limited=1)
+            self._send_json(429, {"error": "Rate limit exceeded"}, {"Retry-After": f"{wait:.3f}"})
+            return True
+        if server.error_rate and random.random() < server.error_rate:
+            server.count(injected_429=1)
+            self._send_json(429, {"error": "Rate limit exceeded"}, {"Retry-After": "0.1"})
+            return True
+        return False
+
+    def _respond(self, method: str, path: str, params: dict[str, str], body: dict | None):
+        if self._throttled():
+            return
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        if server.fixtures is not None and (recorded := server.fixtures.load(method, path, params, body, path)) is not None:
+            server.count(served=1, replayed=1, bytes=len(recorded.content))
+            self._send(recorded.status_code, recorded.content)
+            return
+
+        if (payload := self._synthetic(method, path, params, body)) is None:
+            self._send_json(404, {"error": f"Unknown endpoint: {method} {path}"})
+            return
+        encoded = json.dumps(payload).encode()
+        server.count(served=1, bytes=len(encoded))
+        self._send(200, encoded)
+
+    def _synthetic(self, method: str, path: str, params: dict[str, str], body: dict | None) -> dict | None:
+        ticker = params.get("ticker", "")
+        limit = int(params.get("limit", 1000))
+        if method == "GET" and path == "/prices/":
+            return {"ticker": ticker, "prices": synthetic_prices(ticker, params["start_date"], params["end_date"])}
+        if method == "GET" and path == "/financial-metrics/":
+            return {"financial_metrics": synthetic_financial_metrics(ticker, params["report_period_lte"], params.get("period", "ttm"), limit)}
+        if method == "POST" and path == "/financials/search/line-items":
+            return {"search_results": synthetic_line_items(body["tickers"], body["line_items"], body["end_date"], body.get("period", "ttm"), int(body.get("limit", 10)))}
+        if method == "GET" and path == "/insider-trades/":
+            return {"insider_trades": synthetic_insider_trades(ticker, params["filing_date_lte"], params.get("filing_date_gte"), limit)}
+        if method == "GET" and path == "/news/":
+            return {"news": synthetic_company_news(ticker, params["end_date"], params.get("start_date"), limit)}
+        return None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            with self.server._stats_lock:
+                self._send_json(200, dict(self.server.stats))
+            return
+        self._respond("GET", url.path, dict(parse_qsl(url.query)), None)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+        self._respond("POST", url.path, dict(parse_qsl(url.query)), body)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> APIServer:
+    """Start the stand-in on a daemon thread and return it; port 0 picks a free one. Options are APIServer's."""
+    server = APIServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="api-server", daemon=True).start()
+    return server
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per minute before 429s")
+    parser.add_argument("--burst", type=float, default=None, help="Requests allowed at once under the rate limit")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an injected 429")
+    parser.add_argument("--fixtures", default=None, help="Fixture store to serve recorded responses from")
+
+
+def server_options(args: argparse.Namespace) -> dict[str, any]:
+    return {"latency": args.latency, "jitter": args.jitter, "rate_limit": args.rate_limit, "burst": args.burst, "error_rate": args.error_rate, "fixtures": args.fixtures}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the financial datasets API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = APIServer((args.host, args.port), **server_options(args))
+    print(f"Serving on {server.url}; set FINANCIAL_DATASETS_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats))
@@ -0,0 +1,57 @@
+"""
+Measure what a cache hit costs when records are rebuilt from dicts with full
+pydantic validation, built with model_construct, or handed out as the cached
+model instances themselves. Run from src/:
+
+    python -m benchmarks.cache_hits [--rows 1000] [--hits 200]
+"""
+
+import argparse
+import time
+
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, Price
+
+FIELD_VALUES = {float: 1.5, int: 100, str: "2024-01-02", bool: False}
+
+
+def make_record(model) -> dict:
+    """A dict with a plausible value for every field of model."""
+    record = {}
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        # Unwrap `X | None`
+        types = getattr(annotation, "__args__", (annotation,))
+        record[name] = next((FIELD_VALUES[t] for t in types if t in FIELD_VALUES), None)
+    return record
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return time.perf_counter() - started
+
+
+def run(model, rows: int, hits: int):
+    records = [make_record(model) for _ in range(rows)]
+    instances = [model(**record) for record in records]
+
+    validate = timed(lambda: [model(**record) for record in records], hits)
+    construct = timed(lambda: [model.model_construct(**record) for record in records], hits)
+    cached = timed(lambda: instances[:], hits)
+
+    per_hit = lambda seconds: seconds / hits * 1000
+    print(
+        f"{model.__name__:>16} | {rows} rows x {hits} hits: validate {per_hit(validate):8.3f} ms/hit,"
+        f" model_construct {per_hit(construct):8.3f} ms/hit, cached instances {per_hit(cached):8.4f} ms/hit"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache hit cost by how records are materialized")
+    parser.add_argument("--rows", type=int, default=1000, help="Records returned per hit")
+    parser.add_argument("--hits", type=int, default=200)
+    args = parser.parse_args()
+
+    for model in (Price, FinancialMetrics, InsiderTrade, CompanyNews):
+        run(model, args.rows, args.hits)
@@ -0,0 +1,97 @@
+"""
+Compare the cache's sorted, bisect-indexed record storage against the previous
+list-plus-linear-scan implementation. Run from src/:
+
+    python -m benchmarks.cache_storage [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from data.cache import RECORD_KEYS
+from data.models import CompanyNews
+from data.records import SortedRecords
+
+
+def legacy_merge_data(existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
+    """Cache._merge_data as it was before SortedRecords."""
+    if not existing:
+        return new_data
+    existing_keys = {item[key_field] for item in existing}
+    merged = existing.copy()
+    merged.extend([item for item in new_data if item[key_field] not in existing_keys])
+    return merged
+
+
+def legacy_range(cached_data: list[dict], start_date: str, end_date: str) -> list[dict]:
+    """The filter-and-sort tools.api ran over cached news on every hit."""
+    filtered = [news for news in cached_data if news["date"] >= start_date and news["date"] <= end_date]
+    filtered.sort(key=lambda news: news["date"], reverse=True)
+    return filtered
+
+
+def make_news(n: int) -> list[dict]:
+    start = datetime(2000, 1, 1)
+    return [
+        {"ticker": "AAPL", "title": f"Headline {i}", "author": "", "source": "", "date": (start + timedelta(minutes=7 * i)).isoformat(), "url": f"https://example.com/{i}"}
+        for i in range(n)
+    ]
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def run(n: int, batches: int, queries: int):
+    records = make_news(n)
+    batch_size = max(1, n // batches)
+    chunks = [records[i : i + batch_size] for i in range(0, n, batch_size)]
+    first, last = records[0]["date"][:10], records[-1]["date"][:10]
+    rng = random.Random(0)
+    windows = []
+    for _ in range(queries):
+        end = rng.choice(records)["date"][:10]
+        windows.append(((date.fromisoformat(end) - timedelta(days=30)).isoformat(), end))
+
+    legacy: list[dict] | None = None
+
+    def legacy_build():
+        nonlocal legacy
+        for chunk in chunks:
+            # The old cache used the date as its key field for news
+            legacy = legacy_merge_data(legacy, chunk, key_field="date")
+
+    # The cache holds validated models; build them up front so only storage is timed
+    model_chunks = [[CompanyNews.model_construct(**record) for record in chunk] for chunk in chunks]
+    sorted_records = SortedRecords(*RECORD_KEYS["company_news"])
+
+    def sorted_build():
+        for chunk in model_chunks:
+            sorted_records.merge(chunk)
+
+    build = (timed(legacy_build), timed(sorted_build))
+    query = (
+        timed(lambda: [legacy_range(legacy, start, end) for start, end in windows]),
+        timed(lambda: [sorted_records.range(start, end)[::-1] for start, end in windows]),
+    )
+    assert legacy_range(legacy, first, records[-1]["date"]) == [news.model_dump(include=set(records[0])) for news in sorted_records.range(first, last)[::-1]]
+
+    print(
+        f"{n:>9,} rows | build in {batches} batches: legacy {build[0] * 1000:9.1f} ms, sorted {build[1] * 1000:9.1f} ms"
+        f" | {queries} range queries: legacy {query[0] * 1000:9.1f} ms, sorted {query[1] * 1000:7.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache record storage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--batches", type=int, default=100, help="Number of set_* calls the rows arrive in")
+    parser.add_argument("--queries", type=int, default=50, help="Number of 30-day range queries")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.batches, args.queries)
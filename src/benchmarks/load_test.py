@@ -0,0 +1,108 @@
+"""
+Load-test the data layer against the local stand-in API server: fetch prices, metrics, line items,
+insider trades, news and market caps for many tickers concurrently through tools.async_api, then
+report throughput, failures, rate limiting and per-endpoint latency. Later passes show the cache at
+work. Run from src/:
+
+    python -m benchmarks.load_test [--tickers 50] [--concurrency 20] [--latency 0.05] [--rate-limit 1200] [--error-rate 0.02]
+
+Pass --base-url to load a server that is already running instead of starting one in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import urllib.request
+
+from benchmarks.api_server import add_server_arguments, server_options, start_server
+
+LINE_ITEMS = ["revenue", "net_income", "free_cash_flow", "outstanding_shares"]
+
+
+def server_stats(base_url: str) -> dict[str, int]:
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.loads(response.read())
+
+
+def workload(async_api, tickers: list[str], start_date: str, end_date: str) -> list[tuple]:
+    """The calls a run makes for each ticker, in agather's (coroutine_function, args, kwargs) form."""
+    calls = []
+    for ticker in tickers:
+        calls += [
+            (async_api.aget_prices, (ticker, start_date, end_date), {}),
+            (async_api.aget_financial_metrics, (ticker, end_date), {"period": "ttm", "limit": 10}),
+            (async_api.asearch_line_items, (ticker, LINE_ITEMS, end_date), {"period": "ttm", "limit": 10}),
+            (async_api.aget_insider_trades, (ticker, end_date), {"start_date": start_date}),
+            (async_api.aget_company_news, (ticker, end_date), {"start_date": start_date}),
+            (async_api.aget_market_cap, (ticker, end_date), {}),
+        ]
+    return calls
+
+
+def run_pass(async_api, metrics, base_url: str, calls: list[tuple], concurrency: int, label: str):
+    metrics.reset()
+    before = server_stats(base_url)
+    started = time.perf_counter()
+    results = asyncio.run(async_api.agather(calls, max_concurrency=concurrency))
+    elapsed = time.perf_counter() - started
+    after = server_stats(base_url)
+
+    failures = [result for result in results if isinstance(result, Exception)]
+    served = {name: after[name] - before.get(name, 0) for name in after}
+    print(
+        f"{label}: {len(calls)} calls in {elapsed:.2f} s ({len(calls) / elapsed:,.1f} calls/s), {len(failures)} failed"
+        f" | server: {served['requests']} requests, {served['rate_limited']} rate limited, {served['injected_429']} injected 429s, {served['bytes'] / 2**20:.1f} MiB"
+    )
+    for endpoint, stats in metrics.snapshot()["endpoints"].items():
+        latency = stats["latency"]
+        print(
+            f"  {endpoint:>17}: {stats['hits']:5} hits {stats['misses']:5} misses {stats['negative_hits']:4} negative"
+            f" | {stats['requests']:5} requests, mean {latency['mean'] * 1000:7.1f} ms, max {latency['max'] * 1000:7.1f} ms, {stats['pages']['count']} paginated fetches"
+        )
+    if (queue_wait := metrics.snapshot()["queue_wait"])["count"]:
+        print(f"  rate limiter: {queue_wait['count']} requests through it, mean wait {queue_wait['mean'] * 1000:.1f} ms, max {queue_wait['max'] * 1000:.1f} ms")
+    for failure in failures[:5]:
+        print(f"  failed: {type(failure).__name__}: {str(failure)[:160]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test tools.api against the local stand-in API server")
+    parser.add_argument("--tickers", type=int, default=50, help="Number of synthetic tickers")
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--end-date", default="2024-12-31")
+    parser.add_argument("--concurrency", type=int, default=20, help="Calls in flight at once")
+    parser.add_argument("--passes", type=int, default=2, help="Runs over the same workload; later ones are served from cache")
+    parser.add_argument("--pool-size", type=int, default=None, help="Sets FINANCIAL_DATASETS_POOL_SIZE")
+    parser.add_argument("--max-retries", type=int, default=None, help="Sets FINANCIAL_DATASETS_MAX_RETRIES")
+    parser.add_argument("--window-days", type=int, default=None, help="Sets FINANCIAL_DATASETS_WINDOW_DAYS")
+    parser.add_argument("--client-rate-limit", type=float, default=None, help="Sets FINANCIAL_DATASETS_RATE_LIMIT, requests per minute")
+    parser.add_argument("--client-burst", type=int, default=None, help="Sets FINANCIAL_DATASETS_RATE_BURST")
+    parser.add_argument("--cache-dir", default=None, help="Sets FINANCIAL_DATASETS_CACHE_DIR; memory only by default")
+    parser.add_argument("--base-url", default=None, help="A stand-in server that is already running")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+    else:
+        server = start_server(**server_options(args))
+        base_url = server.url
+
+    # The client and cache read their settings when first imported and used, so set them up front
+    os.environ["FINANCIAL_DATASETS_BASE_URL"] = base_url
+    os.environ.pop("FINANCIAL_DATASETS_FIXTURE_MODE", None)
+    os.environ.pop("FINANCIAL_DATASETS_CACHE_DIR", None)
+    for name, value in (("POOL_SIZE", args.pool_size), ("MAX_RETRIES", args.max_retries), ("WINDOW_DAYS", args.window_days), ("CACHE_DIR", args.cache_dir), ("RATE_LIMIT", args.client_rate_limit), ("RATE_BURST", args.client_burst)):
+        if value is not None:
+            os.environ[f"FINANCIAL_DATASETS_{name}"] = str(value)
+
+    from tools import async_api
+    from tools.metrics import get_metrics
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    calls = workload(async_api, tickers, args.start_date, args.end_date)
+    print(f"Loading {base_url} with {len(tickers)} tickers, {args.concurrency} calls in flight")
+    for i in range(args.passes):
+        run_pass(async_api, get_metrics(), base_url, calls, args.concurrency, "cold" if i == 0 else f"pass {i + 1}")
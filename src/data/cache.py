@@ -1,85 +1,915 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+from operator import attrgetter
+
+import pandas as pd
+
+from data.intervals import MIN_DATE, IntervalSet
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, Price
+from data.price_store import PriceSeries
+from data.records import SortedRecords
+from data.store import SQLiteStore
+
+# How long cached rows stay fresh, in seconds, per endpoint. None means never expire.
+DEFAULT_TTLS: dict[str, float | None] = {
+    "prices": None,  # Historical prices don't change
+    "financial_metrics": 7 * 24 * 3600,
+    "line_items": 7 * 24 * 3600,
+    # Past filings and articles don't change; delta syncs fetch what was published since
+    "insider_trades": None,
+    "company_news": None,
+}
+
+# How long a request that came back empty is remembered, in seconds. Short, since
+# recent ranges fill in as new filings, news and reports are published.
+DEFAULT_NEGATIVE_TTL = 3600
+
+# Days before today whose data may still change or reach the API late, per endpoint: today's bars
+# are still trading, and filings and articles can be ingested a few days after their date. Ranges
+# are recorded as synced for good only up to this many days before today.
+DEFAULT_SETTLE_DAYS: dict[str, int] = {
+    "prices": 1,
+    "insider_trades": 3,
+    "company_news": 3,
+}
+
+# How long a fetch of the unsettled days after that is reused, in seconds, before they are requested again
+DEFAULT_TAIL_TTL = 15 * 60
+
+# In-memory budgets per endpoint, in approximate bytes, beyond which the least recently used
+# tickers are evicted. None means unbounded. Evicted entries are reloaded from the persistent tier.
+DEFAULT_MAX_BYTES: dict[str, int | None] = {
+    "prices": 256 * 2**20,
+    "financial_metrics": 64 * 2**20,
+    "line_items": 64 * 2**20,
+    "insider_trades": 128 * 2**20,
+    "company_news": 128 * 2**20,
+}
+
+# Records sampled per entry to estimate its size
+_SIZE_SAMPLE = 8
+
+
+def _insider_trade_date(trade: InsiderTrade) -> str:
+    return trade.transaction_date or trade.filing_date
+
+
+def _insider_trade_identity(trade: InsiderTrade) -> tuple:
+    # Several trades are often filed on the same day, so the filing date alone isn't unique
+    return (trade.filing_date, trade.name, trade.transaction_date, trade.transaction_shares, trade.security_title)
+
+
+def _company_news_identity(news: CompanyNews) -> tuple:
+    return (news.date, news.url or news.title)
+
+
+# Per endpoint: the date each record is sorted by, and what makes two records duplicates
+RECORD_KEYS = {
+    "financial_metrics": (attrgetter("report_period"), attrgetter("report_period")),
+    "insider_trades": (_insider_trade_date, _insider_trade_identity),
+    "company_news": (attrgetter("date"), _company_news_identity),
+}
+
+# The date the API filters each endpoint's ranges by, which sync coverage is tracked in
+FETCH_DATES = {
+    "insider_trades": attrgetter("filing_date"),
+    "company_news": attrgetter("date"),
+}
+
+def _parse_endpoint_values(value: str | None) -> dict[str, int | None]:
+    """Parse a per-endpoint setting: one number for every endpoint, or e.g. "prices=100000,company_news=20000"."""
+    if not value:
+        return {}
+    if "=" not in value:
+        return {endpoint: int(value) for endpoint in DEFAULT_TTLS}
+    budgets = {}
+    for item in value.split(","):
+        endpoint, _, budget = item.partition("=")
+        budgets[endpoint.strip()] = int(budget)
+    return budgets
+
+
+def _merge_meta(stored: dict[str, any], meta: dict[str, any]) -> dict[str, any]:
+    """Union the date ranges in two coverage payloads, field by field, e.g. when two processes synced different ranges."""
+    merged = dict(stored)
+    for field, value in meta.items():
+        if isinstance(value, dict):
+            merged[field] = _merge_meta(stored.get(field, {}), value)
+        else:
+            intervals = IntervalSet([tuple(interval) for interval in stored.get(field, [])])
+            for start, end in value:
+                intervals.add(start, end)
+            merged[field] = intervals.to_list()
+    return merged
+
+
+def _store_key(key: any) -> str:
+    """The persistent tier's cache_key for an entry's key: the ticker, or e.g. "AAPL|ttm" for (ticker, period)."""
+    return "|".join(key) if isinstance(key, tuple) else key
+
+
+def _record_bytes(record: any) -> int:
+    """Approximate memory held by a model or dict record: the object, its fields and their values."""
+    fields = record if isinstance(record, dict) else record.__dict__
+    return sys.getsizeof(record) + sys.getsizeof(fields) + sum(sys.getsizeof(value) for value in fields.values())
+
+
+def _sampled_bytes(records: any, count: int, overhead: int = 0) -> int:
+    """Estimate the memory of `count` records from the first few, plus a per-record index overhead."""
+    sample = list(islice(records, _SIZE_SAMPLE))
+    if not sample:
+        return 0
+    return count * (sum(_record_bytes(record) for record in sample) // len(sample) + overhead)
+
+
+# Models that records are kept as in memory. They are validated once, when fetched
+# or loaded from the persistent tier, so cache hits hand out the same instances.
+RECORD_MODELS = {
+    "financial_metrics": FinancialMetrics,
+    "insider_trades": InsiderTrade,
+    "company_news": CompanyNews,
+}
+
+
 class Cache:
-    """In-memory cache for API responses."""
-
-    def __init__(self):
-        self._prices_cache: dict[str, list[dict[str, any]]] = {}
-        self._financial_metrics_cache: dict[str, list[dict[str, any]]] = {}
-        self._line_items_cache: dict[str, list[dict[str, any]]] = {}
-        self._insider_trades_cache: dict[str, list[dict[str, any]]] = {}
-        self._company_news_cache: dict[str, list[dict[str, any]]] = {}
-
-    def _merge_data(self, existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
-        """Merge existing and new data, avoiding duplicates based on a key field."""
-        if not existing:
-            return new_data
-        
-        # Create a set of existing keys for O(1) lookup
-        existing_keys = {item[key_field] for item in existing}
-        
-        # Only add items that don't exist yet
-        merged = existing.copy()
-        merged.extend([item for item in new_data if item[key_field] not in existing_keys])
-        return merged
-
-    def get_prices(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached price data if available."""
-        return self._prices_cache.get(ticker)
-
-    def set_prices(self, ticker: str, data: list[dict[str, any]]):
-        """Append new price data to cache."""
-        self._prices_cache[ticker] = self._merge_data(
-            self._prices_cache.get(ticker),
-            data,
-            key_field="time"
-        )
-
-    def get_financial_metrics(self, ticker: str) -> list[dict[str, any]]:
-        """Get cached financial metrics if available."""
-        return self._financial_metrics_cache.get(ticker)
-
-    def set_financial_metrics(self, ticker: str, data: list[dict[str, any]]):
-        """Append new financial metrics to cache."""
-        self._financial_metrics_cache[ticker] = self._merge_data(
-            self._financial_metrics_cache.get(ticker),
-            data,
-            key_field="report_period"
-        )
-
-    def get_line_items(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached line items if available."""
-        return self._line_items_cache.get(ticker)
-
-    def set_line_items(self, ticker: str, data: list[dict[str, any]]):
-        """Append new line items to cache."""
-        self._line_items_cache[ticker] = self._merge_data(
-            self._line_items_cache.get(ticker),
-            data,
-            key_field="report_period"
-        )
-
-    def get_insider_trades(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached insider trades if available."""
-        return self._insider_trades_cache.get(ticker)
-
-    def set_insider_trades(self, ticker: str, data: list[dict[str, any]]):
-        """Append new insider trades to cache."""
-        self._insider_trades_cache[ticker] = self._merge_data(
-            self._insider_trades_cache.get(ticker),
-            data,
-            key_field="filing_date"  # Could also use transaction_date if preferred
-        )
-
-    def get_company_news(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached company news if available."""
-        return self._company_news_cache.get(ticker)
-
-    def set_company_news(self, ticker: str, data: list[dict[str, any]]):
-        """Append new company news to cache."""
-        self._company_news_cache[ticker] = self._merge_data(
-            self._company_news_cache.get(ticker),
-            data,
-            key_field="date"
-        )
+    """In-memory cache for API responses, optionally backed by a persistent SQLite tier."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        ttls: dict[str, float | None] | None = None,
+        negative_ttl: float | None = None,
+        max_rows: dict[str, int | None] | None = None,
+        max_bytes: dict[str, int | None] | None = None,
+        settle_days: dict[str, int] | None = None,
+        tail_ttl: float | None = None,
+    ):
+        """
+        :param cache_dir: Directory for the persistent tier. Defaults to the
+            FINANCIAL_DATASETS_CACHE_DIR environment variable; memory only if neither is set.
+        :param ttls: Per-endpoint overrides of DEFAULT_TTLS.
+        :param negative_ttl: How long empty results are remembered. Defaults to the
+            FINANCIAL_DATASETS_NEGATIVE_TTL environment variable, then DEFAULT_NEGATIVE_TTL.
+        :param max_rows: Per-endpoint limits on the rows held in memory. Defaults to the
+            FINANCIAL_DATASETS_CACHE_MAX_ROWS environment variable; unbounded if neither is set.
+        :param max_bytes: Per-endpoint limits on the approximate bytes held in memory. Defaults to the
+            FINANCIAL_DATASETS_CACHE_MAX_BYTES environment variable, then DEFAULT_MAX_BYTES.
+        :param settle_days: Per-endpoint overrides of how many days before today data may still change.
+            Defaults to the FINANCIAL_DATASETS_SETTLE_DAYS environment variable, then DEFAULT_SETTLE_DAYS.
+        :param tail_ttl: How long a fetch of the unsettled days is reused. Defaults to the
+            FINANCIAL_DATASETS_TAIL_TTL environment variable, then DEFAULT_TAIL_TTL.
+        """
+        self._prices_cache: dict[str, PriceSeries] = {}
+        # ticker -> date ranges whose prices are fully cached
+        self._prices_coverage: dict[str, IntervalSet] = {}
+        # (ticker, period) -> metrics sorted by report_period
+        self._financial_metrics_cache: dict[tuple[str, str], SortedRecords] = {}
+        # (ticker, period) -> report_period ranges known to be complete
+        self._financial_metrics_coverage: dict[tuple[str, str], IntervalSet] = {}
+        # (ticker, period) -> report_period -> union of every line item fetched for that report
+        self._line_items_cache: dict[tuple[str, str], dict[str, dict[str, any]]] = {}
+        # (ticker, period) -> the cached report_periods, sorted, as an as-of index into the rows above
+        self._line_items_periods: dict[tuple[str, str], list[str]] = {}
+        # (ticker, period) -> line item -> report_period ranges known to be complete
+        self._line_items_coverage: dict[tuple[str, str], dict[str, IntervalSet]] = {}
+        self._insider_trades_cache: dict[str, SortedRecords] = {}
+        self._company_news_cache: dict[str, SortedRecords] = {}
+        # (endpoint, ticker) -> filing / publication date ranges whose insider trades or news are fully synced
+        self._sync_coverage: dict[tuple[str, str], IntervalSet] = {}
+        # ticker -> date -> market cap, memoized from the TTM metrics above and cleared when they change
+        self._market_cap_memo: dict[str, dict[str, float]] = {}
+
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        # (endpoint, key) -> when the cached entry was first fetched
+        self._fetched_at: dict[tuple[str, any], float] = {}
+        # (kind, endpoint, key) -> short-lived date ranges, and when the first was recorded: "empty" ranges
+        # the API returned nothing for, and "tail" ranges of unsettled days fetched recently
+        self._ranges: dict[tuple[str, str, tuple], IntervalSet] = {}
+        self._ranges_at: dict[tuple[str, str, tuple], float] = {}
+        self._negative_ttl = negative_ttl
+        self._settle_days = settle_days or {}
+        self._tail_ttl = tail_ttl
+
+        # endpoint -> key -> (rows, bytes) of each entry in memory, least recently used first
+        self._lru: dict[str, OrderedDict[any, tuple[int, int]]] = {endpoint: OrderedDict() for endpoint in DEFAULT_TTLS}
+        # endpoint -> [rows, bytes] summed over its entries
+        self._footprint: dict[str, list[int]] = {endpoint: [0, 0] for endpoint in DEFAULT_TTLS}
+        self._max_rows = max_rows or {}
+        self._max_bytes = max_bytes or {}
+        # (endpoint, key) -> how many fetches and reads are using the entry, which keeps it from being evicted
+        self._pinned: dict[tuple[str, any], int] = {}
+
+        # (endpoint, key) -> the entry's version in the persistent tier when it was last read from or written to it
+        self._store_versions: dict[tuple[str, any], int] = {}
+
+        # Guards every entry above; agents and prefetch workers share one Cache across threads
+        self._lock = threading.RLock()
+
+        self._cache_dir = cache_dir
+        self._store: SQLiteStore | None = None
+        self._store_resolved = False
+
+    def _get_store(self) -> SQLiteStore | None:
+        """
+        Open the persistent tier on first use so environment variables loaded after import apply.
+        Expired rows are purged as it opens, since no lookup reads them again.
+        """
+        if not self._store_resolved:
+            self._store_resolved = True
+            cache_dir = self._cache_dir or os.environ.get("FINANCIAL_DATASETS_CACHE_DIR")
+            if cache_dir:
+                self._store = SQLiteStore(os.path.join(cache_dir, "api_cache.sqlite3"))
+                self._store.purge_expired(self._store_ttls())
+        return self._store
+
+    def _store_ttls(self) -> dict[str, float | None]:
+        """How long rows stay valid in the persistent tier, per stored endpoint, remembered empty and tail ranges included."""
+        negative_ttl = self.get_negative_ttl()
+        tail_ttl = self.get_tail_ttl()
+        return {**self.ttls, **{f"{endpoint}:empty": negative_ttl for endpoint in DEFAULT_TTLS}, **{f"{endpoint}:tail": tail_ttl for endpoint in DEFAULT_SETTLE_DAYS}}
+
+    def get_negative_ttl(self) -> float:
+        """How long empty results are remembered, resolved on use so environment variables loaded after import apply."""
+        if self._negative_ttl is not None:
+            return self._negative_ttl
+        return float(os.environ.get("FINANCIAL_DATASETS_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL))
+
+    def get_settle_days(self, endpoint: str) -> int:
+        """How many days before today an endpoint's data may still change, resolved on use so environment variables loaded after import apply."""
+        if endpoint in self._settle_days:
+            return self._settle_days[endpoint]
+        return _parse_endpoint_values(os.environ.get("FINANCIAL_DATASETS_SETTLE_DAYS")).get(endpoint, DEFAULT_SETTLE_DAYS.get(endpoint, 0))
+
+    def get_tail_ttl(self) -> float:
+        """How long a fetch of the unsettled days is reused, resolved on use so environment variables loaded after import apply."""
+        if self._tail_ttl is not None:
+            return self._tail_ttl
+        return float(os.environ.get("FINANCIAL_DATASETS_TAIL_TTL", DEFAULT_TAIL_TTL))
+
+    def _mark_fetched(self, endpoint: str, ticker: str, coverage: IntervalSet, start_date: str, end_date: str):
+        """
+        Record [start_date, end_date] as fetched: for good up to the endpoint's settle lag, and for the tail
+        TTL after it, so repeated requests up to today reuse the fetch without settling days that can change.
+        """
+        settled = (date.today() - timedelta(days=self.get_settle_days(endpoint))).isoformat()
+        coverage.add(start_date, min(end_date, settled))
+        if end_date[:10] > settled:
+            tail_start = max(start_date[:10], (date.fromisoformat(settled) + timedelta(days=1)).isoformat())
+            self._add_range("tail", endpoint, (ticker,), tail_start, end_date, self.get_tail_ttl())
+
+    def _with_tail(self, endpoint: str, ticker: str, coverage: IntervalSet | None) -> IntervalSet | None:
+        """Coverage plus the unsettled days fetched within the tail TTL."""
+        tail = self._load_ranges("tail", endpoint, (ticker,), self.get_tail_ttl())
+        if not tail:
+            return coverage
+        combined = IntervalSet(coverage.to_list() if coverage else [])
+        for start, end in tail.to_list():
+            combined.add(start, end)
+        return combined
+
+    def _is_expired(self, endpoint: str, key: any) -> bool:
+        ttl = self.ttls.get(endpoint)
+        fetched_at = self._fetched_at.get((endpoint, key))
+        return ttl is not None and fetched_at is not None and time.time() - fetched_at > ttl
+
+    def get_budget(self, endpoint: str) -> tuple[int | None, int | None]:
+        """An endpoint's (max rows, max bytes) in memory, resolved on use so environment variables loaded after import apply."""
+        max_rows = self._max_rows[endpoint] if endpoint in self._max_rows else _parse_endpoint_values(os.environ.get("FINANCIAL_DATASETS_CACHE_MAX_ROWS")).get(endpoint)
+        if endpoint in self._max_bytes:
+            max_bytes = self._max_bytes[endpoint]
+        else:
+            max_bytes = _parse_endpoint_values(os.environ.get("FINANCIAL_DATASETS_CACHE_MAX_BYTES")).get(endpoint, DEFAULT_MAX_BYTES.get(endpoint))
+        return max_rows, max_bytes
+
+    def _measure(self, endpoint: str, key: any) -> tuple[int, int]:
+        """Rows and approximate bytes an entry holds in memory."""
+        if endpoint == "prices":
+            series = self._prices_cache.get(key)
+            if series is None:
+                return 0, 0
+            return len(series), series.nbytes + (_sampled_bytes(series.models, len(series.models)) if series.models else 0)
+        if endpoint == "line_items":
+            rows = self._line_items_cache.get(key, {})
+            # Plus the report period's slot in the as-of index
+            return len(rows), _sampled_bytes(rows.values(), len(rows), overhead=8)
+        records = {"financial_metrics": self._financial_metrics_cache, "insider_trades": self._insider_trades_cache, "company_news": self._company_news_cache}[endpoint].get(key)
+        if records is None:
+            return 0, 0
+        # Plus each record's sort key and identity, held in SortedRecords' index
+        sample = next(iter(records), None)
+        overhead = sys.getsizeof(RECORD_KEYS[endpoint][1](sample)) + 3 * 8 if sample is not None else 0
+        return len(records), _sampled_bytes(records, len(records), overhead)
+
+    def _touch(self, endpoint: str, key: any):
+        """Mark an entry as the most recently used."""
+        if key in self._lru[endpoint]:
+            self._lru[endpoint].move_to_end(key)
+
+    def _account(self, endpoint: str, key: any):
+        """Re-measure an entry that was loaded or grew, mark it most recently used and evict others to fit the budget."""
+        lru, footprint = self._lru[endpoint], self._footprint[endpoint]
+        old_rows, old_bytes = lru.pop(key, (0, 0))
+        rows, nbytes = lru[key] = self._measure(endpoint, key)
+        footprint[0] += rows - old_rows
+        footprint[1] += nbytes - old_bytes
+        self._shrink(endpoint, keep=key)
+
+    def _shrink(self, endpoint: str, keep: any = None):
+        """
+        Evict least recently used entries until the endpoint fits its budget. The entry just used and
+        pinned entries stay, even when that leaves the endpoint over budget until they are unpinned.
+        """
+        lru, footprint = self._lru[endpoint], self._footprint[endpoint]
+        max_rows, max_bytes = self.get_budget(endpoint)
+        for key in [key for key in lru if key != keep and (endpoint, key) not in self._pinned]:
+            if (max_rows is None or footprint[0] <= max_rows) and (max_bytes is None or footprint[1] <= max_bytes):
+                break
+            self._evict(endpoint, key)
+
+    @contextmanager
+    def pinned(self, endpoint: str, key: any):
+        """
+        Keep an entry in memory while it is fetched and the result read back, so another ticker's fetch
+        can't evict pages before their range is marked synced, or rows before they are returned.
+        """
+        with self._lock:
+            self._pinned[(endpoint, key)] = self._pinned.get((endpoint, key), 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                if self._pinned[(endpoint, key)] == 1:
+                    del self._pinned[(endpoint, key)]
+                    self._shrink(endpoint)
+                else:
+                    self._pinned[(endpoint, key)] -= 1
+
+    def _evict(self, endpoint: str, key: any):
+        """Drop an entry from memory. The persistent tier keeps its rows, so the next lookup reloads it."""
+        if endpoint == "prices":
+            self._prices_cache.pop(key, None)
+            self._prices_coverage.pop(key, None)
+        elif endpoint == "financial_metrics":
+            self._financial_metrics_cache.pop(key, None)
+            self._financial_metrics_coverage.pop(key, None)
+        elif endpoint == "line_items":
+            self._line_items_cache.pop(key, None)
+            self._line_items_periods.pop(key, None)
+            self._line_items_coverage.pop(key, None)
+        else:
+            {"insider_trades": self._insider_trades_cache, "company_news": self._company_news_cache}[endpoint].pop(key, None)
+            self._sync_coverage.pop((endpoint, key), None)
+        if endpoint == "financial_metrics" and key[1] == "ttm":
+            self._market_cap_memo.pop(key[0], None)
+        if endpoint in DEFAULT_SETTLE_DAYS:
+            # The tail ranges vouch for rows that were just dropped
+            self._ranges.pop(("tail", endpoint, (key,)), None)
+            self._ranges_at.pop(("tail", endpoint, (key,)), None)
+        self._fetched_at.pop((endpoint, key), None)
+        self._store_versions.pop((endpoint, key), None)
+
+        rows, nbytes = self._lru[endpoint].pop(key, (0, 0))
+        self._footprint[endpoint][0] -= rows
+        self._footprint[endpoint][1] -= nbytes
+
+    def _reload_if_changed(self, endpoint: str, key: any) -> bool:
+        """
+        On a miss, drop the entry from memory if another process has written it to the persistent tier
+        since it was read, so the next lookup reloads it with whatever that process fetched.
+        Returns whether it was dropped.
+        """
+        store = self._get_store()
+        if store is None or self._store_versions.get((endpoint, key)) == store.version(endpoint, _store_key(key)):
+            return False
+        self._evict(endpoint, key)
+        return True
+
+    def _wrote(self, endpoint: str, key: any, versions: tuple[int, int]):
+        """
+        Keep an entry's version current after writing it through, unless another process wrote
+        it since it was read, in which case the next miss still reloads it.
+        """
+        previous, version = versions
+        if self._store_versions.get((endpoint, key)) == previous:
+            self._store_versions[(endpoint, key)] = version
+
+    def footprint(self) -> dict[str, dict[str, int | None]]:
+        """Per endpoint: the entries, rows and approximate bytes held in memory, and the budgets they are evicted at."""
+        with self._lock:
+            result = {}
+            for endpoint, lru in self._lru.items():
+                max_rows, max_bytes = self.get_budget(endpoint)
+                rows, nbytes = self._footprint[endpoint]
+                result[endpoint] = {"entries": len(lru), "rows": rows, "bytes": nbytes, "max_rows": max_rows, "max_bytes": max_bytes}
+            return result
+
+    def _get(self, endpoint: str, cache: dict[str, SortedRecords], ticker: str) -> SortedRecords | None:
+        """Read from memory, falling back to the persistent tier. Expired entries are dropped."""
+        if ticker in cache:
+            if not self._is_expired(endpoint, ticker):
+                self._touch(endpoint, ticker)
+                return cache[ticker]
+            self._evict(endpoint, ticker)
+
+        store = self._get_store()
+        if store is None:
+            return None
+
+        # Read before loading, so a write that lands in between triggers a reload rather than being missed
+        self._store_versions[(endpoint, ticker)] = store.version(endpoint, ticker)
+        records, fetched_at = store.load(endpoint, ticker, max_age=self.ttls.get(endpoint))
+        meta, created_at = store.load_meta(endpoint, ticker, max_age=self.ttls.get(endpoint))
+        if not records and meta is None:
+            return None
+        model = RECORD_MODELS[endpoint]
+        cache[ticker] = SortedRecords(*RECORD_KEYS[endpoint])
+        cache[ticker].merge([model.model_validate(record) for record in records])
+        self._sync_coverage[(endpoint, ticker)] = IntervalSet([tuple(interval) for interval in meta["coverage"]] if meta else [])
+        self._fetched_at[(endpoint, ticker)] = fetched_at or created_at
+        self._account(endpoint, ticker)
+        return cache[ticker]
+
+    def _set(
+        self,
+        endpoint: str,
+        cache: dict[str, SortedRecords],
+        ticker: str,
+        data: list,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        limit: int | None = None,
+        payloads: list[dict[str, any]] | None = None,
+    ):
+        """
+        Merge new data into memory and write it through to the persistent tier, as the given payloads,
+        e.g. the API's own JSON objects, or else dumped from the models. When the request's end_date is
+        given, the range it fetched in full is recorded as synced.
+        """
+        self._get(endpoint, cache, ticker)
+        cache.setdefault(ticker, SortedRecords(*RECORD_KEYS[endpoint])).merge(data)
+        self._account(endpoint, ticker)
+        self._fetched_at.setdefault((endpoint, ticker), time.time())
+
+        if store := self._get_store():
+            identity = RECORD_KEYS[endpoint][1]
+            self._wrote(endpoint, ticker, store.save(endpoint, ticker, {str(identity(record)): payload for record, payload in zip(data, payloads or (record.model_dump() for record in data))}))
+
+        if end_date is not None:
+            oldest = min(FETCH_DATES[endpoint](record) for record in data) if data else None
+            self._mark_synced(endpoint, cache, ticker, start_date, end_date, limit, len(data), oldest)
+
+    def _mark_synced(self, endpoint: str, cache: dict[str, SortedRecords], ticker: str, start_date: str | None, end_date: str, limit: int | None, count: int, oldest: str | None):
+        """
+        Record [start_date, end_date] as synced, see _mark_fetched, once every record fetched for it is set.
+        Without a start_date the request was for the latest `limit` rows, of which count came back,
+        the oldest with fetch date oldest.
+        """
+        self._get(endpoint, cache, ticker)
+        # Synced ranges need an entry, even an empty one, for lookups to be answered from
+        if ticker not in cache:
+            cache[ticker] = SortedRecords(*RECORD_KEYS[endpoint])
+            self._account(endpoint, ticker)
+        created_at = self._fetched_at.setdefault((endpoint, ticker), time.time())
+        coverage = self._sync_coverage.setdefault((endpoint, ticker), IntervalSet())
+
+        if start_date is None and limit is not None and count >= limit:
+            # A full page of the latest rows: its oldest day may have been cut off part way
+            start_date = (date.fromisoformat(oldest[:10]) + timedelta(days=1)).isoformat()
+        self._mark_fetched(endpoint, ticker, coverage, start_date or MIN_DATE, end_date)
+
+        if store := self._get_store():
+            self._wrote(endpoint, ticker, store.merge_meta(endpoint, ticker, {"coverage": coverage.to_list()}, created_at, _merge_meta, max_age=self.ttls.get(endpoint)))
+
+    def range_to_fetch(self, endpoint: str, ticker: str, start_date: str | None, end_date: str, limit: int) -> tuple[str | None, str] | None:
+        """
+        What to request from the API for insider trades or news in [start_date, end_date], see _range_to_fetch.
+        On a miss, the entry is reloaded first if another process has synced it since.
+        """
+        with self._lock:
+            missing = self._range_to_fetch(endpoint, ticker, start_date, end_date, limit)
+            if missing is not None and self._reload_if_changed(endpoint, ticker):
+                missing = self._range_to_fetch(endpoint, ticker, start_date, end_date, limit)
+            return missing
+
+    def _range_to_fetch(self, endpoint: str, ticker: str, start_date: str | None, end_date: str, limit: int) -> tuple[str | None, str] | None:
+        """
+        What to request from the API for insider trades or news in [start_date, end_date]: None when the
+        range is already synced, just the unsynced part when that is all that's missing, e.g. what was
+        published since the last sync, and the requested range otherwise. Without a start_date the
+        request is for the latest `limit` rows up to end_date.
+        """
+        records = self._get(endpoint, {"insider_trades": self._insider_trades_cache, "company_news": self._company_news_cache}[endpoint], ticker)
+        coverage = self._with_tail(endpoint, ticker, self._sync_coverage.get((endpoint, ticker)))
+        if records is None or not coverage:
+            return start_date, end_date
+
+        if start_date is not None:
+            if not (gaps := coverage.gaps(start_date, end_date)):
+                return None
+            return gaps[0][0], gaps[-1][1]
+
+        fetch_date = FETCH_DATES[endpoint]
+
+        def holds_latest(interval: tuple[str, str], upto: str) -> bool:
+            """Whether interval reaches back far enough to hold the latest `limit` rows up to upto."""
+            if interval[0] == MIN_DATE:
+                return True
+            # Rows from the day before a latest-page sync starts are the newest of its cut-off last day
+            day_before = (date.fromisoformat(interval[0]) - timedelta(days=1)).isoformat()
+            # Coverage is in fetch dates, which for insider trades can be later than the dates rows are sorted by
+            count = 0
+            for record in records.latest(upto):
+                if day_before <= fetch_date(record)[:10] <= upto[:10]:
+                    count += 1
+                    if count >= limit:
+                        return True
+            return False
+
+        if (interval := coverage.find(end_date)) is not None and holds_latest(interval, end_date):
+            return None
+        # The high-water mark: if the newest synced range still holds enough rows, fetch only what came after it
+        newest = coverage.to_list()[-1]
+        if newest[1] < end_date[:10] and holds_latest(newest, newest[1]):
+            return (date.fromisoformat(newest[1]) + timedelta(days=1)).isoformat(), end_date
+        return None, end_date
+
+    def _load_prices(self, ticker: str):
+        """Make sure the ticker's price entry in memory is fresh, loading it from the persistent tier if needed."""
+        if ticker in self._prices_coverage:
+            if not self._is_expired("prices", ticker):
+                self._touch("prices", ticker)
+                return
+            self._evict("prices", ticker)
+
+        store = self._get_store()
+        if store is None:
+            return
+
+        self._store_versions[("prices", ticker)] = store.version("prices", ticker)
+        meta, created_at = store.load_meta("prices", ticker, max_age=self.ttls.get("prices"))
+        if meta is None:
+            return
+        records, _ = store.load("prices", ticker, since=created_at)
+        self._prices_cache[ticker] = PriceSeries()
+        self._prices_cache[ticker].merge(records)
+        self._prices_coverage[ticker] = IntervalSet([tuple(interval) for interval in meta["coverage"]])
+        self._fetched_at[("prices", ticker)] = created_at
+        self._account("prices", ticker)
+
+    def missing_price_ranges(self, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        """Return the sub-ranges of [start_date, end_date] whose prices aren't cached, in this process or by another."""
+        with self._lock:
+            gaps = self._missing_price_ranges(ticker, start_date, end_date)
+            if gaps and self._reload_if_changed("prices", ticker):
+                gaps = self._missing_price_ranges(ticker, start_date, end_date)
+            return gaps
+
+    def _missing_price_ranges(self, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        self._load_prices(ticker)
+        if coverage := self._with_tail("prices", ticker, self._prices_coverage.get(ticker)):
+            return coverage.gaps(start_date, end_date)
+        return [(start_date, end_date)]
+
+    def get_prices(self, ticker: str, start_date: str | None = None, end_date: str | None = None) -> list[Price] | None:
+        """
+        Get cached price data if available, optionally restricted to a date range, sorted by time.
+        The models are validated on the first lookup after a merge and handed out again on later hits.
+        """
+        with self._lock:
+            self._load_prices(ticker)
+            if (series := self._prices_cache.get(ticker)) is None:
+                return None
+            built = series.models is None
+            prices = series.to_models(start_date, end_date)
+            if built:
+                # The models count towards the endpoint's budget
+                self._account("prices", ticker)
+            return prices
+
+    def get_price_frame(self, ticker: str, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame | None:
+        """Get cached price data as a Date-indexed DataFrame, built from the columnar store without per-row objects."""
+        with self._lock:
+            self._load_prices(ticker)
+            if (series := self._prices_cache.get(ticker)) is None:
+                return None
+            return series.to_frame(start_date, end_date)
+
+    def set_prices(self, ticker: str, data: list[dict[str, any]], start_date: str | None = None, end_date: str | None = None):
+        """
+        Append new price data to cache. When the requested range is given it is marked as covered,
+        see _mark_fetched, since the latest bars may still change.
+        """
+        with self._lock:
+            self._load_prices(ticker)
+            self._prices_cache.setdefault(ticker, PriceSeries()).merge(data)
+            self._account("prices", ticker)
+            coverage = self._prices_coverage.setdefault(ticker, IntervalSet())
+            if start_date and end_date:
+                self._mark_fetched("prices", ticker, coverage, start_date, end_date)
+            created_at = self._fetched_at.setdefault(("prices", ticker), time.time())
+
+            if store := self._get_store():
+                self._wrote("prices", ticker, store.save("prices", ticker, {price["time"]: price for price in data}))
+                self._wrote("prices", ticker, store.merge_meta("prices", ticker, {"coverage": coverage.to_list()}, created_at, _merge_meta, max_age=self.ttls.get("prices")))
+
+    def _load_financial_metrics(self, ticker: str, period: str):
+        """Make sure the (ticker, period) metrics entry in memory is fresh, loading it from the persistent tier if needed."""
+        key = (ticker, period)
+        if key in self._financial_metrics_cache:
+            if not self._is_expired("financial_metrics", key):
+                self._touch("financial_metrics", key)
+                return
+            self._evict("financial_metrics", key)
+
+        store = self._get_store()
+        if store is None:
+            return
+
+        cache_key = _store_key(key)
+        self._store_versions[("financial_metrics", key)] = store.version("financial_metrics", cache_key)
+        meta, created_at = store.load_meta("financial_metrics", cache_key, max_age=self.ttls.get("financial_metrics"))
+        if meta is None:
+            return
+        records, _ = store.load("financial_metrics", cache_key, since=created_at)
+        self._financial_metrics_cache[key] = SortedRecords(*RECORD_KEYS["financial_metrics"])
+        self._financial_metrics_cache[key].merge([FinancialMetrics.model_validate(record) for record in records])
+        self._financial_metrics_coverage[key] = IntervalSet([tuple(interval) for interval in meta["coverage"]])
+        self._fetched_at[("financial_metrics", key)] = created_at
+        self._account("financial_metrics", key)
+
+    def get_financial_metrics(self, ticker: str, period: str, end_date: str, limit: int) -> list[FinancialMetrics] | None:
+        """Get the latest `limit` cached financial metrics for a period up to end_date, newest first, if they are all cached."""
+        with self._lock:
+            metrics = self._get_financial_metrics(ticker, period, end_date, limit)
+            if metrics is None and self._reload_if_changed("financial_metrics", (ticker, period)):
+                metrics = self._get_financial_metrics(ticker, period, end_date, limit)
+            return metrics
+
+    def _get_financial_metrics(self, ticker: str, period: str, end_date: str, limit: int) -> list[FinancialMetrics] | None:
+        self._load_financial_metrics(ticker, period)
+        key = (ticker, period)
+        if (coverage := self._financial_metrics_coverage.get(key)) is None or (interval := coverage.find(end_date)) is None:
+            return None
+        records = self._financial_metrics_cache[key]
+        # A covered range that starts at MIN_DATE holds the ticker's full history
+        if interval[0] != MIN_DATE and records.count(interval[0], end_date) < limit:
+            return None
+        return records.latest(end_date, limit)
+
+    def set_financial_metrics(self, ticker: str, period: str, end_date: str, limit: int, data: list[FinancialMetrics]):
+        """Merge fetched financial metrics into cache and record which report periods they cover."""
+        with self._lock:
+            self._load_financial_metrics(ticker, period)
+            key = (ticker, period)
+            self._financial_metrics_cache.setdefault(key, SortedRecords(*RECORD_KEYS["financial_metrics"])).merge(data)
+            if period == "ttm":
+                self._market_cap_memo.pop(ticker, None)
+            self._account("financial_metrics", key)
+
+            # A full page covers back to its oldest report; a short page covers the whole history
+            start = min(metric.report_period for metric in data) if len(data) >= limit else MIN_DATE
+            coverage = self._financial_metrics_coverage.setdefault(key, IntervalSet())
+            coverage.add(start, end_date)
+            created_at = self._fetched_at.setdefault(("financial_metrics", key), time.time())
+
+            if store := self._get_store():
+                cache_key = _store_key(key)
+                self._wrote("financial_metrics", key, store.save("financial_metrics", cache_key, {metric.report_period: metric.model_dump() for metric in data}))
+                self._wrote("financial_metrics", key, store.merge_meta("financial_metrics", cache_key, {"coverage": coverage.to_list()}, created_at, _merge_meta, max_age=self.ttls.get("financial_metrics")))
+
+    def _load_line_items(self, ticker: str, period: str):
+        """Make sure the (ticker, period) line item entry in memory is fresh, loading it from the persistent tier if needed."""
+        key = (ticker, period)
+        if key in self._line_items_cache:
+            if not self._is_expired("line_items", key):
+                self._touch("line_items", key)
+                return
+            self._evict("line_items", key)
+
+        store = self._get_store()
+        if store is None:
+            return
+
+        cache_key = _store_key(key)
+        self._store_versions[("line_items", key)] = store.version("line_items", cache_key)
+        meta, created_at = store.load_meta("line_items", cache_key, max_age=self.ttls.get("line_items"))
+        if meta is None:
+            return
+        records, _ = store.load("line_items", cache_key, since=created_at)
+        self._line_items_cache[key] = {record["report_period"]: record for record in records}
+        self._line_items_periods[key] = sorted(self._line_items_cache[key])
+        self._line_items_coverage[key] = {field: IntervalSet([tuple(interval) for interval in intervals]) for field, intervals in meta["coverage"].items()}
+        self._fetched_at[("line_items", key)] = created_at
+        self._account("line_items", key)
+
+    def missing_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int) -> list[str]:
+        """Return the requested line items whose latest `limit` reports up to end_date aren't all cached."""
+        with self._lock:
+            missing = self._missing_line_items(ticker, period, line_items, end_date, limit)
+            if missing and self._reload_if_changed("line_items", (ticker, period)):
+                missing = self._missing_line_items(ticker, period, line_items, end_date, limit)
+            return missing
+
+    def _missing_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int) -> list[str]:
+        self._load_line_items(ticker, period)
+        key = (ticker, period)
+        coverage = self._line_items_coverage.get(key, {})
+        report_periods = self._line_items_periods.get(key, [])
+
+        missing = []
+        for line_item in line_items:
+            interval = coverage[line_item].find(end_date) if line_item in coverage else None
+            # A covered range that starts at MIN_DATE holds the ticker's full history
+            if interval is None or (interval[0] != MIN_DATE and bisect_right(report_periods, end_date) - bisect_left(report_periods, interval[0]) < limit):
+                missing.append(line_item)
+        return missing
+
+    def get_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int) -> list[dict[str, any]]:
+        """Get the latest `limit` cached reports up to end_date, restricted to the requested line items."""
+        with self._lock:
+            self._load_line_items(ticker, period)
+            key = (ticker, period)
+            rows = self._line_items_cache.get(key, {})
+            fields = ["ticker", "report_period", "period", "currency", *line_items]
+            # Bisect the as-of index for the latest `limit` reports on or before end_date
+            periods = self._line_items_periods.get(key, [])
+            hi = bisect_right(periods, end_date)
+            report_periods = periods[max(0, hi - limit) : hi][::-1]
+            return [{field: rows[report_period][field] for field in fields if field in rows[report_period]} for report_period in report_periods]
+
+    def set_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int, data: list[dict[str, any]], complete: bool | None = None):
+        """
+        Merge fetched line items into cache and record which reports they cover.
+        complete says whether data holds every report up to end_date, e.g. because the response it came
+        from was cut short of its limit; it defaults to whether data is short of `limit`, which only holds
+        when the request was for this ticker alone.
+        """
+        with self._lock:
+            self._load_line_items(ticker, period)
+            key = (ticker, period)
+            rows = self._line_items_cache.setdefault(key, {})
+            periods = self._line_items_periods.setdefault(key, [])
+            for record in data:
+                if record["report_period"] not in rows:
+                    insort(periods, record["report_period"])
+                rows.setdefault(record["report_period"], {}).update(record)
+            self._account("line_items", key)
+
+            # A complete result covers the whole history; otherwise the rows cover back to their oldest report
+            if complete is None:
+                complete = len(data) < limit
+            start = MIN_DATE if complete else min((record["report_period"] for record in data), default=None)
+            coverage = self._line_items_coverage.setdefault(key, {})
+            for line_item in line_items:
+                coverage.setdefault(line_item, IntervalSet())
+                if start is not None:
+                    coverage[line_item].add(start, end_date)
+            created_at = self._fetched_at.setdefault(("line_items", key), time.time())
+
+            if store := self._get_store():
+                cache_key = _store_key(key)
+                self._wrote("line_items", key, store.save("line_items", cache_key, {record["report_period"]: rows[record["report_period"]] for record in data}))
+                meta = {"coverage": {field: intervals.to_list() for field, intervals in coverage.items()}}
+                self._wrote("line_items", key, store.merge_meta("line_items", cache_key, meta, created_at, _merge_meta, max_age=self.ttls.get("line_items")))
+
+    def get_market_cap(self, ticker: str, end_date: str) -> float | None:
+        """
+        Get the market cap as of end_date from cached data only, or None if it can't be derived.
+        Uses the latest TTM financial metrics report on or before end_date, as the API lookup does,
+        and only when the TTM coverage includes end_date. Other periods' reports are ignored, so the
+        answer doesn't depend on which agent happened to fetch first. Results are memoized per date,
+        so repeated lookups are O(1).
+        """
+        with self._lock:
+            memo = self._market_cap_memo.setdefault(ticker, {})
+            if end_date in memo:
+                return memo[end_date]
+            self._load_financial_metrics(ticker, "ttm")
+            key = (ticker, "ttm")
+            if (coverage := self._financial_metrics_coverage.get(key)) is None or coverage.find(end_date) is None:
+                return None
+            latest = self._financial_metrics_cache[key].latest(end_date, 1)
+            market_cap = latest[0].market_cap if latest else None
+            if market_cap:
+                memo[end_date] = market_cap
+            return market_cap or None
+
+    def get_insider_trades(self, ticker: str, start_date: str | None = None, end_date: str | None = None, limit: int | None = None) -> list[InsiderTrade] | None:
+        """Get cached insider trades within a date range, newest first, if available. Without a start_date, at most `limit` are returned."""
+        with self._lock:
+            if (records := self._get("insider_trades", self._insider_trades_cache, ticker)) is None:
+                return None
+            if start_date is None and limit is not None:
+                return records.latest(end_date, limit)
+            return records.range(start_date, end_date)[::-1]
+
+    def set_insider_trades(
+        self,
+        ticker: str,
+        data: list[InsiderTrade],
+        start_date: str | None = None,
+        end_date: str | None = None,
+        limit: int | None = None,
+        payloads: list[dict[str, any]] | None = None,
+    ):
+        """
+        Append new insider trades to cache, recording the requested range as synced when end_date is given.
+        payloads, if given, are the records' JSON objects as fetched, persisted as they are.
+        """
+        with self._lock:
+            self._set("insider_trades", self._insider_trades_cache, ticker, data, start_date, end_date, limit, payloads)
+
+    def get_company_news(self, ticker: str, start_date: str | None = None, end_date: str | None = None, limit: int | None = None) -> list[CompanyNews] | None:
+        """Get cached company news within a date range, newest first, if available. Without a start_date, at most `limit` are returned."""
+        with self._lock:
+            if (records := self._get("company_news", self._company_news_cache, ticker)) is None:
+                return None
+            if start_date is None and limit is not None:
+                return records.latest(end_date, limit)
+            return records.range(start_date, end_date)[::-1]
+
+    def set_company_news(
+        self,
+        ticker: str,
+        data: list[CompanyNews],
+        start_date: str | None = None,
+        end_date: str | None = None,
+        limit: int | None = None,
+        payloads: list[dict[str, any]] | None = None,
+    ):
+        """
+        Append new company news to cache, recording the requested range as synced when end_date is given.
+        payloads, if given, are the records' JSON objects as fetched, persisted as they are.
+        """
+        with self._lock:
+            self._set("company_news", self._company_news_cache, ticker, data, start_date, end_date, limit, payloads)
+
+    def mark_synced(self, endpoint: str, ticker: str, start_date: str | None, end_date: str, limit: int | None = None, count: int = 0, oldest: str | None = None):
+        """
+        Record an insider trade or news range as synced after its records were set in pieces, e.g. page by page.
+        For a latest-`limit` request, count is how many rows came back and oldest the earliest of their fetch dates.
+        """
+        with self._lock:
+            cache = {"insider_trades": self._insider_trades_cache, "company_news": self._company_news_cache}[endpoint]
+            self._mark_synced(endpoint, cache, ticker, start_date, end_date, limit, count, oldest)
+
+    def _load_ranges(self, kind: str, endpoint: str, key: tuple, ttl: float) -> IntervalSet | None:
+        """
+        The date ranges recorded for a key under kind, "empty" or "tail", while younger than ttl,
+        loading them from the persistent tier if needed.
+        """
+        entry = (kind, endpoint, key)
+        if entry in self._ranges:
+            if time.time() - self._ranges_at[entry] <= ttl:
+                return self._ranges[entry]
+            del self._ranges[entry]
+            del self._ranges_at[entry]
+
+        store = self._get_store()
+        if store is None:
+            return None
+
+        meta, created_at = store.load_meta(f"{endpoint}:{kind}", "|".join(key), max_age=ttl)
+        if meta is None:
+            return None
+        self._ranges[entry] = IntervalSet([tuple(interval) for interval in meta["ranges"]])
+        self._ranges_at[entry] = created_at
+        return self._ranges[entry]
+
+    def _add_range(self, kind: str, endpoint: str, key: tuple, start_date: str, end_date: str, ttl: float):
+        """Record [start_date, end_date] for a key under kind; the ranges recorded together expire ttl after the first."""
+        self._load_ranges(kind, endpoint, key, ttl)
+        entry = (kind, endpoint, key)
+        ranges = self._ranges.setdefault(entry, IntervalSet())
+        ranges.add(start_date, end_date)
+        created_at = self._ranges_at.setdefault(entry, time.time())
+
+        if store := self._get_store():
+            store.merge_meta(f"{endpoint}:{kind}", "|".join(key), {"ranges": ranges.to_list()}, created_at, _merge_meta, max_age=ttl)
+
+    def is_known_empty(self, endpoint: str, key: tuple, start_date: str | None, end_date: str) -> bool:
+        """Whether a request for [start_date, end_date] recently came back empty, within a range that did."""
+        with self._lock:
+            ranges = self._load_ranges("empty", endpoint, key, self.get_negative_ttl())
+            return bool(ranges) and not ranges.gaps(start_date or MIN_DATE, end_date)
+
+    def set_empty(self, endpoint: str, key: tuple, start_date: str | None, end_date: str):
+        """Remember that the API returned nothing for [start_date, end_date]; no start date means all history."""
+        with self._lock:
+            self._add_range("empty", endpoint, key, start_date or MIN_DATE, end_date, self.get_negative_ttl())
+
+    def purge_expired(self):
+        """Drop expired rows from the persistent tier. Done when it opens; long-running processes can call this periodically."""
+        with self._lock:
+            if store := self._get_store():
+                store.purge_expired(self._store_ttls())
 
 
 # Global cache instance
@@ -0,0 +1,71 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+
+# Lower bound for intervals that extend back to the start of a series
+MIN_DATE = "0001-01-01"
+
+
+def _next_day(day: str) -> str:
+    return (date.fromisoformat(day[:10]) + timedelta(days=1)).isoformat()
+
+
+def _previous_day(day: str) -> str:
+    return (date.fromisoformat(day[:10]) - timedelta(days=1)).isoformat()
+
+
+class IntervalSet:
+    """Sorted, non-overlapping set of closed date intervals (YYYY-MM-DD strings)."""
+
+    def __init__(self, intervals: list[tuple[str, str]] | None = None):
+        self._intervals: list[tuple[str, str]] = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def add(self, start: str, end: str):
+        """Add [start, end], merging it with any overlapping or adjacent intervals."""
+        start, end = start[:10], end[:10]
+        if start > end:
+            return
+
+        merged = []
+        for lo, hi in self._intervals:
+            if _next_day(hi) < start or lo > _next_day(end):
+                merged.append((lo, hi))
+            else:
+                start, end = min(lo, start), max(hi, end)
+        merged.append((start, end))
+        merged.sort()
+        self._intervals = merged
+
+    def find(self, day: str) -> tuple[str, str] | None:
+        """Return the interval containing day, if any."""
+        day = day[:10]
+        i = bisect_right(self._intervals, (day, "9999-12-31")) - 1
+        if i >= 0 and self._intervals[i][0] <= day <= self._intervals[i][1]:
+            return self._intervals[i]
+        return None
+
+    def gaps(self, start: str, end: str) -> list[tuple[str, str]]:
+        """Return the sub-ranges of [start, end] that are not covered."""
+        start, end = start[:10], end[:10]
+        gaps = []
+        cursor = start
+        for lo, hi in self._intervals:
+            if hi < cursor:
+                continue
+            if lo > end:
+                break
+            if lo > cursor:
+                gaps.append((cursor, _previous_day(lo)))
+            cursor = _next_day(hi)
+            if cursor > end:
+                return gaps
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def to_list(self) -> list[tuple[str, str]]:
+        return list(self._intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
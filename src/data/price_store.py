@@ -0,0 +1,91 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data.models import Price
+
+# Float columns, in the order Price.model_dump() produces them
+PRICE_COLUMNS = ["open", "close", "high", "low"]
+
+
+class PriceSeries:
+    """
+    Columnar daily prices for one ticker, kept sorted by time.
+    Range lookups bisect a datetime64 day index, and DataFrames are built by copying
+    slices of the arrays instead of from per-row Python objects.
+    """
+
+    def __init__(self):
+        self.times = np.empty(0, dtype=object)
+        self.days = np.empty(0, dtype="datetime64[D]")
+        self.values = np.empty((0, len(PRICE_COLUMNS)), dtype=np.float64)
+        self.volume = np.empty(0, dtype=np.int64)
+        self.index = pd.DatetimeIndex([], name="Date")
+        # Price models of the rows, validated on first use and shared by later lookups until the next merge
+        self.models: list[Price] | None = None
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the series, counting the time strings the object array points to."""
+        strings = len(self.times) * sys.getsizeof(self.times[0]) if len(self.times) else 0
+        return self.times.nbytes + strings + self.days.nbytes + self.values.nbytes + self.volume.nbytes + self.index.nbytes
+
+    def merge(self, records: list[dict[str, any]]):
+        """Merge price dicts into the series. New rows replace stored rows with the same time, e.g. a bar refetched before it settled."""
+        if not records:
+            return
+
+        times = np.concatenate([self.times, np.array([record["time"] for record in records], dtype=object)])
+        values = np.concatenate([self.values, np.array([[record[column] for column in PRICE_COLUMNS] for record in records], dtype=np.float64)])
+        volume = np.concatenate([self.volume, np.array([record["volume"] for record in records], dtype=np.int64)])
+
+        # ISO timestamps sort chronologically; return_index picks each time's first occurrence in the
+        # reversed arrays, i.e. its last, newest one
+        _, first = np.unique(times[::-1], return_index=True)
+        last = len(times) - 1 - first
+        self.times = times[last]
+        self.values = np.ascontiguousarray(values[last])
+        self.volume = volume[last]
+        self.days = self.times.astype("U10").astype("datetime64[D]")
+        self.index = pd.DatetimeIndex(pd.to_datetime(self.times), name="Date")
+        self.models = None
+
+        for array in (self.times, self.values, self.volume, self.days):
+            array.flags.writeable = False
+
+    def _bounds(self, start_date: str | None, end_date: str | None) -> tuple[int, int]:
+        """Positions of the first and one-past-last rows within [start_date, end_date], in O(log n)."""
+        start = 0 if start_date is None else int(np.searchsorted(self.days, np.datetime64(start_date[:10]), side="left"))
+        end = len(self.days) if end_date is None else int(np.searchsorted(self.days, np.datetime64(end_date[:10]), side="right"))
+        return start, max(start, end)
+
+    def to_records(self, start_date: str | None = None, end_date: str | None = None) -> list[dict[str, any]]:
+        """Rows within the date range as price dicts, oldest first."""
+        start, end = self._bounds(start_date, end_date)
+        values = self.values[start:end].tolist()
+        return [
+            {"open": row[0], "close": row[1], "high": row[2], "low": row[3], "volume": volume, "time": time}
+            for row, volume, time in zip(values, self.volume[start:end].tolist(), self.times[start:end].tolist())
+        ]
+
+    def to_models(self, start_date: str | None = None, end_date: str | None = None) -> list[Price]:
+        """Rows within the date range as Price models, oldest first, validated once rather than on every lookup."""
+        if self.models is None:
+            self.models = [Price.model_validate(record) for record in self.to_records()]
+        start, end = self._bounds(start_date, end_date)
+        return self.models[start:end]
+
+    def to_frame(self, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """
+        Rows within the date range as a Date-indexed DataFrame shaped like prices_to_df's output.
+        The frame owns copies of the slices, since the stored arrays are read-only, so callers may edit it.
+        """
+        start, end = self._bounds(start_date, end_date)
+        df = pd.DataFrame(self.values[start:end], columns=PRICE_COLUMNS, index=self.index[start:end], copy=True)
+        df["volume"] = self.volume[start:end].copy()
+        df["time"] = self.times[start:end].copy()
+        return df
@@ -0,0 +1,74 @@
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from typing import Callable, Hashable, Iterator
+
+# Upper bound appended to an end date so that timestamps on that day compare as <= it
+_END_OF_DAY = "\uffff"
+
+
+class SortedRecords:
+    """
+    Records for one ticker, kept sorted by a date key with duplicates dropped by an identity key.
+    Range queries bisect the sorted keys in O(log n); batches that are newer than
+    everything stored are appended in amortized O(1) per record.
+    """
+
+    def __init__(self, sort_key: Callable[[any], str], identity: Callable[[any], Hashable]):
+        self._sort_key = sort_key
+        self._identity = identity
+        self._keys: list[str] = []
+        self._records: list[any] = []
+        self._identities: set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[any]:
+        return iter(self._records)
+
+    def merge(self, records: list[any]):
+        """Add records not stored yet, keeping the first copy of each identity."""
+        new_records = []
+        for record in records:
+            identity = self._identity(record)
+            if identity not in self._identities:
+                self._identities.add(identity)
+                new_records.append(record)
+        if not new_records:
+            return
+
+        new_records.sort(key=self._sort_key)
+        new_keys = [self._sort_key(record) for record in new_records]
+
+        if not self._keys or new_keys[0] >= self._keys[-1]:
+            # Newer than everything stored: the common case for incremental fetches
+            self._keys.extend(new_keys)
+            self._records.extend(new_records)
+        elif len(new_records) * 16 < len(self._records):
+            # A few out-of-order records: insert each in place
+            for key, record in zip(new_keys, new_records):
+                i = bisect_right(self._keys, key)
+                self._keys.insert(i, key)
+                self._records.insert(i, record)
+        else:
+            merged = list(merge(zip(self._keys, range(len(self._keys)), self._records), zip(new_keys, range(len(self._keys), len(self._keys) + len(new_keys)), new_records)))
+            self._keys = [key for key, _, _ in merged]
+            self._records = [record for _, _, record in merged]
+
+    def range(self, start: str | None = None, end: str | None = None) -> list[any]:
+        """Records whose key falls within [start, end] by date, oldest first."""
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end + _END_OF_DAY)
+        return self._records[lo:hi]
+
+    def count(self, start: str | None = None, end: str | None = None) -> int:
+        """Number of records whose key falls within [start, end] by date, in O(log n)."""
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end + _END_OF_DAY)
+        return max(0, hi - lo)
+
+    def latest(self, end: str | None = None, limit: int | None = None) -> list[any]:
+        """Up to `limit` most recent records with a key on or before end, newest first."""
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end + _END_OF_DAY)
+        lo = 0 if limit is None else max(0, hi - limit)
+        return self._records[lo:hi][::-1]
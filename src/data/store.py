@@ -0,0 +1,177 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+
+class SQLiteStore:
+    """
+    Persistent SQLite tier for API responses, shared across process restarts and between
+    processes, e.g. web workers, that point at the same file. The database runs in WAL mode
+    so readers don't block the writer, and each process opens its own connection.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        :param path: SQLite file, created along with its directory if missing.
+        :param timeout: Seconds to wait for another process's write lock before failing.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.timeout = timeout
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        with self._lock:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        The connection for this process, opened on first use and again after a fork, since
+        SQLite connections must not cross into a child process. Callers hold the lock.
+        """
+        if self._pid == os.getpid():
+            return self._conn
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL is durable across process crashes at this level; only a power loss can lose the last commits
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS records (
+                       endpoint TEXT NOT NULL,
+                       cache_key TEXT NOT NULL,
+                       record_key TEXT NOT NULL,
+                       payload TEXT NOT NULL,
+                       fetched_at REAL NOT NULL,
+                       PRIMARY KEY (endpoint, cache_key, record_key)
+                   )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS meta (
+                       endpoint TEXT NOT NULL,
+                       cache_key TEXT NOT NULL,
+                       payload TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       PRIMARY KEY (endpoint, cache_key)
+                   )"""
+            )
+            # Bumped by every write to a key, so a process can tell which of its entries another one changed
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS versions (
+                       endpoint TEXT NOT NULL,
+                       cache_key TEXT NOT NULL,
+                       version INTEGER NOT NULL,
+                       PRIMARY KEY (endpoint, cache_key)
+                   )"""
+            )
+        return self._conn
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                # A forked child inherits the parent's lock, possibly held by a thread that didn't survive the fork
+                self._lock = threading.Lock()
+            with self._lock:
+                self._connect()
+        return self._conn
+
+    def load(self, endpoint: str, cache_key: str, max_age: float | None = None, since: float | None = None) -> tuple[list[dict[str, any]], float | None]:
+        """
+        Load the records stored for a key that are younger than max_age seconds
+        and were fetched no earlier than since. Returns the records and the oldest fetch time among them.
+        """
+        query = "SELECT payload, fetched_at FROM records WHERE endpoint = ? AND cache_key = ?"
+        params: list = [endpoint, cache_key]
+        if max_age is not None:
+            query += " AND fetched_at >= ?"
+            params.append(time.time() - max_age)
+        if since is not None:
+            query += " AND fetched_at >= ?"
+            params.append(since)
+
+        conn = self._connection()
+        with self._lock:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return [], None
+        return [json.loads(payload) for payload, _ in rows], min(fetched_at for _, fetched_at in rows)
+
+    def _bump(self, conn: sqlite3.Connection, endpoint: str, cache_key: str) -> tuple[int, int]:
+        """Increment a key's version within the caller's write transaction. Returns the versions before and after."""
+        conn.execute("INSERT INTO versions VALUES (?, ?, 1) ON CONFLICT (endpoint, cache_key) DO UPDATE SET version = version + 1", (endpoint, cache_key))
+        version = conn.execute("SELECT version FROM versions WHERE endpoint = ? AND cache_key = ?", (endpoint, cache_key)).fetchone()[0]
+        return version - 1, version
+
+    def version(self, endpoint: str, cache_key: str) -> int:
+        """A number that changes whenever a key's records or bookkeeping are written, by any process; 0 if never."""
+        conn = self._connection()
+        with self._lock:
+            row = conn.execute("SELECT version FROM versions WHERE endpoint = ? AND cache_key = ?", (endpoint, cache_key)).fetchone()
+        return row[0] if row else 0
+
+    def save(self, endpoint: str, cache_key: str, records: dict[str, dict[str, any]]) -> tuple[int, int]:
+        """
+        Insert or refresh records, given as {record_key: record}, where record_key identifies a record within the key.
+        Returns the key's version before and after the write.
+        """
+        now = time.time()
+        rows = [(endpoint, cache_key, record_key, json.dumps(record), now) for record_key, record in records.items()]
+        conn = self._connection()
+        with self._lock, conn:
+            conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", rows)
+            return self._bump(conn, endpoint, cache_key)
+
+    def load_meta(self, endpoint: str, cache_key: str, max_age: float | None = None) -> tuple[dict[str, any] | None, float | None]:
+        """Load the bookkeeping stored alongside a key's records, with its creation time."""
+        conn = self._connection()
+        with self._lock:
+            row = conn.execute("SELECT payload, created_at FROM meta WHERE endpoint = ? AND cache_key = ?", (endpoint, cache_key)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def merge_meta(self, endpoint: str, cache_key: str, meta: dict[str, any], created_at: float, merge: Callable[[dict, dict], dict], max_age: float | None = None) -> tuple[int, int]:
+        """
+        Save bookkeeping combined by merge(stored, meta) with what is stored, in one transaction, so
+        another process's concurrent write isn't overwritten. Stored meta older than max_age is replaced;
+        the merged meta keeps the older of the two creation times. Returns the key's version before and after the write.
+        """
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT payload, created_at FROM meta WHERE endpoint = ? AND cache_key = ?", (endpoint, cache_key)).fetchone()
+                if row is not None and (max_age is None or time.time() - row[1] <= max_age):
+                    meta = merge(json.loads(row[0]), meta)
+                    created_at = min(created_at, row[1])
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?)", (endpoint, cache_key, json.dumps(meta), created_at))
+                versions = self._bump(conn, endpoint, cache_key)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return versions
+
+    def purge_expired(self, ttls: dict[str, float | None]):
+        """Drop records older than their endpoint's TTL."""
+        now = time.time()
+        conn = self._connection()
+        with self._lock, conn:
+            for endpoint, ttl in ttls.items():
+                if ttl is not None:
+                    conn.execute("DELETE FROM records WHERE endpoint = ? AND fetched_at < ?", (endpoint, now - ttl))
+                    conn.execute("DELETE FROM meta WHERE endpoint = ? AND created_at < ?", (endpoint, now - ttl))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
@@ -18,6 +18,7 @@ from agents.valuation import valuation_agent
 from utils.display import print_trading_output
 from utils.analysts import ANALYST_ORDER, get_analyst_nodes
 from utils.progress import progress
+from tools.planner import plan_requests, prefetch_plan
 from llm.models import LLM_ORDER, get_model_info
 from utils.db import get_agent_data, insert_into_sql_server,insert_trade_decision
 
@@ -72,6 +73,10 @@ def run_hedge_fund(
         else:
             agent = app
 
+        # Fetch what the selected analysts need up front as one deduplicated set of requests.
+        # Failures are left to the agents, which retry the fetch and report the error themselves.
+        prefetch_plan(plan_requests(tickers, selected_analysts, start_date, end_date))
+
         final_state = agent.invoke(
             {
                 "messages": [
@@ -1,11 +1,18 @@
+import datetime
+import math
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Iterator
+
 import pandas as pd
-import requests
 
-from data.cache import get_cache
+from data.cache import FETCH_DATES, get_cache
+from data.price_store import PriceSeries
 from data.models import (
     CompanyNews,
-    CompanyNewsResponse,
     FinancialMetrics,
     FinancialMetricsResponse,
     Price,
@@ -13,41 +20,99 @@ from data.models import (
     LineItem,
     LineItemResponse,
     InsiderTrade,
-    InsiderTradeResponse,
 )
+from tools.http_client import APIError, get_client
+from tools.json_stream import iter_array
+from tools.metrics import get_metrics
+from tools.singleflight import SingleFlight
 
 # Global cache instance
 _cache = get_cache()
 
+# Shared pooled HTTP client
+_client = get_client()
+
+# Concurrent misses for the same request share one network call
+_inflight = SingleFlight()
+
+# Per-endpoint hit, miss and network counters
+_metrics = get_metrics()
+
+# Days per window when a long insider trade or news range is fetched in parallel
+DEFAULT_WINDOW_DAYS = 180
+
+# Bytes read at a time from streamed insider trade and news pages
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# The financial metrics get_market_cap reads the market cap from, see tools.planner
+MARKET_CAP_METRICS = {"period": "ttm", "limit": 10}
+
+# Workers for windowed fetches, separate from async_api's so nested use can't deadlock
+_window_executor: ThreadPoolExecutor | None = None
+_window_executor_lock = threading.Lock()
+
+
+def _get_window_executor() -> ThreadPoolExecutor:
+    """Create the window workers on first use, sized to the client's pool after environment variables are loaded."""
+    global _window_executor
+    if _window_executor is None:
+        with _window_executor_lock:
+            if _window_executor is None:
+                _window_executor = ThreadPoolExecutor(max_workers=_client.pool_size, thread_name_prefix="api-window")
+    return _window_executor
+
+
+def _request(endpoint: str, method: str, path: str, params: dict | None = None, json: dict | None = None, stream: bool = False):
+    """
+    Send a request through the shared client, recording its latency, body size and status under endpoint.
+    A streamed response's latency is time to its headers, and its body is counted as it is read.
+    """
+    started = time.perf_counter()
+    try:
+        response = _client.request(method, path, params=params, json=json, stream=stream)
+    except Exception:
+        _metrics.record_request(endpoint, time.perf_counter() - started, 0, 0)
+        raise
+    _metrics.record_request(endpoint, time.perf_counter() - started, 0 if stream else len(response.content), response.status_code)
+    return response
+
 
 def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
-    """Fetch price data from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_prices(ticker):
-        # Filter cached data by date range and convert to Price objects
-        filtered_data = [Price(**price) for price in cached_data if start_date <= price["time"] <= end_date]
-        if filtered_data:
-            return filtered_data
-
-    # If not in cache or no data in range, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
-
-    url = f"https://api.financialdatasets.ai/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={start_date}&end_date={end_date}"
-    response = requests.get(url, headers=headers)
+    """Fetch price data from cache or API, requesting only the date ranges not cached yet."""
+    # Pinned so a concurrent miss on another ticker can't evict the series between filling and reading it
+    with _cache.pinned("prices", ticker):
+        _fill_price_gaps(ticker, start_date, end_date)
+        # Hits hand out the models validated on the first lookup
+        return _cache.get_prices(ticker, start_date, end_date) or []
+
+
+def _fill_price_gaps(ticker: str, start_date: str, end_date: str):
+    """Fetch and cache the parts of [start_date, end_date] that aren't cached yet."""
+    # Unsettled days are only covered briefly after a fetch, so also skip ranges that recently came back empty
+    gaps = [(gap_start, gap_end) for gap_start, gap_end in _cache.missing_price_ranges(ticker, start_date, end_date) if not _cache.is_known_empty("prices", (ticker,), gap_start, gap_end)]
+    if not gaps:
+        _metrics.record_hit("prices")
+        return
+    _metrics.record_miss("prices")
+    for gap_start, gap_end in gaps:
+        _inflight.do(("prices", ticker, gap_start, gap_end), _fetch_prices, ticker, gap_start, gap_end)
+
+
+def _fetch_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
+    """Fetch daily prices for a date range from the API and cache them."""
+    params = {"ticker": ticker, "interval": "day", "interval_multiplier": 1, "start_date": start_date, "end_date": end_date}
+    response = _request("prices", "GET", "/prices/", params=params)
     if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+        raise APIError(f"Error fetching data: {ticker} - {response.status_code} - {response.text}", response.status_code)
 
     # Parse response with Pydantic model
     price_response = PriceResponse(**response.json())
     prices = price_response.prices
 
+    # Cache the results as dicts, marking the range as covered even if it had no trading days
+    _cache.set_prices(ticker, [p.model_dump() for p in prices], start_date, end_date)
     if not prices:
-        return []
-
-    # Cache the results as dicts
-    _cache.set_prices(ticker, [p.model_dump() for p in prices])
+        _cache.set_empty("prices", (ticker,), start_date, end_date)
     return prices
 
 
@@ -59,22 +124,27 @@ def get_financial_metrics(
 ) -> list[FinancialMetrics]:
     """Fetch financial metrics from cache or API."""
     # Check cache first
-    if cached_data := _cache.get_financial_metrics(ticker):
-        # Filter cached data by date and limit
-        filtered_data = [FinancialMetrics(**metric) for metric in cached_data if metric["report_period"] <= end_date]
-        filtered_data.sort(key=lambda x: x.report_period, reverse=True)
-        if filtered_data:
-            return filtered_data[:limit]
+    if (cached_data := _cache.get_financial_metrics(ticker, period, end_date, limit)) is not None:
+        # Cached data comes back filtered by period, date and limit, newest first
+        _metrics.record_hit("financial_metrics")
+        return cached_data
+
+    # Tickers with no reports up to end_date come back empty until the negative TTL passes
+    if _cache.is_known_empty("financial_metrics", (ticker, period), None, end_date):
+        _metrics.record_negative_hit("financial_metrics")
+        return []
 
     # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    _metrics.record_miss("financial_metrics")
+    return _inflight.do(("financial_metrics", ticker, end_date, period, limit), _fetch_financial_metrics, ticker, end_date, period, limit)
+
 
-    url = f"https://api.financialdatasets.ai/financial-metrics/?ticker={ticker}&report_period_lte={end_date}&limit={limit}&period={period}"
-    response = requests.get(url, headers=headers)
+def _fetch_financial_metrics(ticker: str, end_date: str, period: str, limit: int) -> list[FinancialMetrics]:
+    """Fetch financial metrics from the API and cache them."""
+    params = {"ticker": ticker, "report_period_lte": end_date, "limit": limit, "period": period}
+    response = _request("financial_metrics", "GET", "/financial-metrics/", params=params)
     if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+        raise APIError(f"Error fetching data: {ticker} - {response.status_code} - {response.text}", response.status_code)
 
     # Parse response with Pydantic model
     metrics_response = FinancialMetricsResponse(**response.json())
@@ -82,13 +152,42 @@ def get_financial_metrics(
     financial_metrics = metrics_response.financial_metrics
 
     if not financial_metrics:
+        _cache.set_empty("financial_metrics", (ticker, period), None, end_date)
         return []
 
-    # Cache the results as dicts
-    _cache.set_financial_metrics(ticker, [m.model_dump() for m in financial_metrics])
+    # Cache the validated models themselves
+    _cache.set_financial_metrics(ticker, period, end_date, limit, financial_metrics)
     return financial_metrics
 
 
+# Roughly how many reports each period type publishes a year, to size as-of fetches
+REPORTS_PER_YEAR = {"ttm": 4, "quarterly": 4, "annual": 1}
+
+
+def get_financial_metrics_as_of(
+    ticker: str,
+    as_of_dates: list[str],
+    period: str = "ttm",
+    limit: int = 10,
+) -> dict[str, list[FinancialMetrics]]:
+    """
+    Fetch the latest `limit` financial metrics as of each date, as a point-in-time backtest needs them.
+    The whole span is fetched at most once; each date is then answered by bisecting the cached
+    report_period index, and the lists returned share the cached model instances.
+    """
+    if not as_of_dates:
+        return {}
+    first, last = min(as_of_dates), max(as_of_dates)
+    if _cache.get_financial_metrics(ticker, period, first, limit) is None or _cache.get_financial_metrics(ticker, period, last, limit) is None:
+        # Enough reports for `limit` as of the first date, plus those published since
+        span_days = (datetime.date.fromisoformat(last[:10]) - datetime.date.fromisoformat(first[:10])).days
+        extra = math.ceil(span_days / 365 * REPORTS_PER_YEAR.get(period, 4)) + 1
+        get_financial_metrics(ticker, last, period, limit + extra)
+
+    # Dates the span fetch didn't cover, e.g. after irregular filings, fall back to their own request
+    return {as_of: get_financial_metrics(ticker, as_of, period, limit) for as_of in as_of_dates}
+
+
 def search_line_items(
     ticker: str,
     line_items: list[str],
@@ -96,32 +195,85 @@ def search_line_items(
     period: str = "ttm",
     limit: int = 10,
 ) -> list[LineItem]:
-    """Fetch line items from API."""
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    """Fetch line items from cache or API."""
+    return search_line_items_batch([ticker], line_items, end_date, period, limit)[ticker]
 
-    url = "https://api.financialdatasets.ai/financials/search/line-items"
 
+def search_line_items_batch(
+    tickers: list[str],
+    line_items: list[str],
+    end_date: str,
+    period: str = "ttm",
+    limit: int = 10,
+) -> dict[str, list[LineItem]]:
+    """Fetch line items for several tickers from cache or API, using one request for everything missing."""
+    # Pinned so storing one ticker's rows can't evict another's before they are read back
+    with ExitStack() as pins:
+        for ticker in tickers:
+            pins.enter_context(_cache.pinned("line_items", (ticker, period)))
+        return _search_line_items_batch(tickers, line_items, end_date, period, limit)
+
+
+def _search_line_items_batch(tickers: list[str], line_items: list[str], end_date: str, period: str, limit: int) -> dict[str, list[LineItem]]:
+    """Sync the line items of tickers that are pinned in the cache and read them back."""
+    # Check cache first, and only ask the API for the line items that aren't covered
+    missing = {ticker: _cache.missing_line_items(ticker, period, line_items, end_date, limit) for ticker in tickers}
+    # Tickers that recently came back with no reports at all aren't asked for again until that expires
+    known_empty = {ticker for ticker in tickers if missing[ticker] and _cache.is_known_empty("line_items", (ticker, period), None, end_date)}
+    tickers_to_fetch = [ticker for ticker in tickers if missing[ticker] and ticker not in known_empty]
+    fields_to_fetch = [line_item for line_item in line_items if any(line_item in missing[ticker] for ticker in tickers_to_fetch)]
+    for ticker in tickers:
+        if ticker in known_empty:
+            _metrics.record_negative_hit("line_items")
+        elif missing[ticker]:
+            _metrics.record_miss("line_items")
+        else:
+            _metrics.record_hit("line_items")
+
+    if tickers_to_fetch:
+        key = ("line_items", tuple(tickers_to_fetch), tuple(fields_to_fetch), end_date, period, limit)
+        _inflight.do(key, _fetch_line_items, tickers_to_fetch, fields_to_fetch, end_date, period, limit)
+
+    return {ticker: [LineItem(**row) for row in _cache.get_line_items(ticker, period, line_items, end_date, limit)] for ticker in tickers}
+
+
+def _fetch_line_items(
+    tickers: list[str],
+    line_items: list[str],
+    end_date: str,
+    period: str,
+    limit: int,
+) -> dict[str, list[LineItem]]:
+    """Request line items for several tickers in one POST, split the results by ticker and cache them."""
     body = {
-        "tickers": [ticker],
+        "tickers": tickers,
         "line_items": line_items,
         "end_date": end_date,
         "period": period,
-        "limit": limit,
+        # Ask for enough rows to give every ticker `limit` periods
+        "limit": limit * len(tickers),
     }
-    response = requests.post(url, headers=headers, json=body)
+    response = _request("line_items", "POST", "/financials/search/line-items", json=body)
     if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+        raise APIError(f"Error fetching data: {', '.join(tickers)} - {response.status_code} - {response.text}", response.status_code)
     data = response.json()
     response_model = LineItemResponse(**data)
     search_results = response_model.search_results
-    if not search_results:
-        return []
 
-    # Cache the results
-    return search_results[:limit]
+    results: dict[str, list[LineItem]] = {ticker: [] for ticker in tickers}
+    for item in search_results:
+        if item.ticker in results:
+            results[item.ticker].append(item)
+
+    # The limit may apply to the whole response, so one ticker can fill it and leave the others short.
+    # Only a response that came back short holds every report of every ticker, as long as none is cut below.
+    response_complete = len(search_results) < body["limit"]
+    for ticker, items in results.items():
+        _cache.set_line_items(ticker, period, line_items, end_date, limit, [item.model_dump() for item in items[:limit]], complete=response_complete and len(items) <= limit)
+        if not items and not response_complete:
+            # A full response gives no coverage to a ticker it has no rows for, so remember it came back empty
+            _cache.set_empty("line_items", (ticker, period), None, end_date)
+    return {ticker: items[:limit] for ticker, items in results.items()}
 
 
 def get_insider_trades(
@@ -131,60 +283,78 @@ def get_insider_trades(
     limit: int = 1000,
 ) -> list[InsiderTrade]:
     """Fetch insider trades from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_insider_trades(ticker):
-        # Filter cached data by date range
-        filtered_data = [InsiderTrade(**trade) for trade in cached_data 
-                        if (start_date is None or (trade.get("transaction_date") or trade["filing_date"]) >= start_date)
-                        and (trade.get("transaction_date") or trade["filing_date"]) <= end_date]
-        filtered_data.sort(key=lambda x: x.transaction_date or x.filing_date, reverse=True)
-        if filtered_data:
-            return filtered_data
+    # Pinned so the pages fetched stay in memory until they are read back, however tight the budget
+    with _cache.pinned("insider_trades", ticker):
+        _sync_insider_trades(ticker, end_date, start_date, limit)
+        # Cached data comes back filtered by date range, newest first
+        return _cache.get_insider_trades(ticker, start_date, end_date, limit) or []
 
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
 
-    all_trades = []
+def _sync_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int):
+    """Make sure the cache holds the requested insider trades."""
+    # Check cache first: only what was published after the last sync, if anything, needs fetching
+    if (missing := _cache.range_to_fetch("insider_trades", ticker, start_date, end_date, limit)) is None:
+        _metrics.record_hit("insider_trades")
+    elif _cache.is_known_empty("insider_trades", (ticker,), *missing):
+        _metrics.record_negative_hit("insider_trades")
+    else:
+        _metrics.record_miss("insider_trades")
+        fetch_start, fetch_end = missing
+        _inflight.do(("insider_trades", ticker, fetch_end, fetch_start, limit), _fetch_insider_trades, ticker, fetch_end, fetch_start, limit)
+
+
+def _fetch_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int) -> int:
+    """Fetch insider trades from the API into the cache one page at a time, in concurrent date windows for long ranges."""
+    count, oldest = _fetch_windows("insider_trades", _page_insider_trades, _cache.set_insider_trades, ticker, end_date, start_date, limit)
+
+    if not count:
+        _cache.set_empty("insider_trades", (ticker,), start_date, end_date)
+
+    # Record the range as synced even if nothing was published in it
+    _cache.mark_synced("insider_trades", ticker, start_date, end_date, limit, count, oldest)
+    return count
+
+
+def _page_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int) -> Iterator[tuple[list[InsiderTrade], list[dict]]]:
+    """Page through the insider trades in a date range, newest first, yielding each page's models and JSON objects."""
     current_end_date = end_date
+    pages = 0
     
-    while True:
-        url = f"https://api.financialdatasets.ai/insider-trades/?ticker={ticker}&filing_date_lte={current_end_date}"
-        if start_date:
-            url += f"&filing_date_gte={start_date}"
-        url += f"&limit={limit}"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
-        
-        data = response.json()
-        response_model = InsiderTradeResponse(**data)
-        insider_trades = response_model.insider_trades
-        
-        if not insider_trades:
-            break
+    try:
+        while True:
+            pages += 1
+            params = {"ticker": ticker, "filing_date_lte": current_end_date}
+            if start_date:
+                params["filing_date_gte"] = start_date
+            params["limit"] = limit
+
+            response = _request("insider_trades", "GET", "/insider-trades/", params=params, stream=True)
+            if response.status_code != 200:
+                raise APIError(f"Error fetching data: {ticker} - {response.status_code} - {response.text}", response.status_code)
             
-        all_trades.extend(insider_trades)
-        
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(insider_trades) < limit:
-            break
+            # Each record is validated as the stream yields it, in one pass over the body
+            payloads, insider_trades = [], []
+            for payload in _stream_records("insider_trades", response, "insider_trades"):
+                payloads.append(payload)
+                insider_trades.append(InsiderTrade.model_validate(payload))
             
-        # Update end_date to the oldest filing date from current batch for next iteration
-        current_end_date = min(trade.filing_date for trade in insider_trades).split('T')[0]
-        
-        # If we've reached or passed the start_date, we can stop
-        if current_end_date <= start_date:
-            break
-
-    if not all_trades:
-        return []
-
-    # Cache the results
-    _cache.set_insider_trades(ticker, [trade.model_dump() for trade in all_trades])
-    return all_trades
+            if not insider_trades:
+                break
+                
+            yield insider_trades, payloads
+            
+            # Only continue pagination if we have a start_date and got a full page
+            if not start_date or len(insider_trades) < limit:
+                break
+                
+            # Update end_date to the oldest filing date from current batch for next iteration
+            current_end_date = min(trade.filing_date for trade in insider_trades).split('T')[0]
+            
+            # If we've reached or passed the start_date, we can stop
+            if current_end_date <= start_date:
+                break
+    finally:
+        _metrics.record_pages("insider_trades", pages)
 
 
 def get_company_news(
@@ -194,60 +364,139 @@ def get_company_news(
     limit: int = 1000,
 ) -> list[CompanyNews]:
     """Fetch company news from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_company_news(ticker):
-        # Filter cached data by date range
-        filtered_data = [CompanyNews(**news) for news in cached_data 
-                        if (start_date is None or news["date"] >= start_date)
-                        and news["date"] <= end_date]
-        filtered_data.sort(key=lambda x: x.date, reverse=True)
-        if filtered_data:
-            return filtered_data
+    # Pinned so the pages fetched stay in memory until they are read back, however tight the budget
+    with _cache.pinned("company_news", ticker):
+        _sync_company_news(ticker, end_date, start_date, limit)
+        # Cached data comes back filtered by date range, newest first
+        return _cache.get_company_news(ticker, start_date, end_date, limit) or []
+
+
+def _sync_company_news(ticker: str, end_date: str, start_date: str | None, limit: int):
+    """Make sure the cache holds the requested company news."""
+    # Check cache first: only what was published after the last sync, if anything, needs fetching
+    if (missing := _cache.range_to_fetch("company_news", ticker, start_date, end_date, limit)) is None:
+        _metrics.record_hit("company_news")
+    elif _cache.is_known_empty("company_news", (ticker,), *missing):
+        _metrics.record_negative_hit("company_news")
+    else:
+        _metrics.record_miss("company_news")
+        fetch_start, fetch_end = missing
+        _inflight.do(("company_news", ticker, fetch_end, fetch_start, limit), _fetch_company_news, ticker, fetch_end, fetch_start, limit)
+
+
+def _fetch_company_news(ticker: str, end_date: str, start_date: str | None, limit: int) -> int:
+    """Fetch company news from the API into the cache one page at a time, in concurrent date windows for long ranges."""
+    count, oldest = _fetch_windows("company_news", _page_company_news, _cache.set_company_news, ticker, end_date, start_date, limit)
+
+    if not count:
+        _cache.set_empty("company_news", (ticker,), start_date, end_date)
+
+    # Record the range as synced even if nothing was published in it
+    _cache.mark_synced("company_news", ticker, start_date, end_date, limit, count, oldest)
+    return count
 
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
 
-    all_news = []
+def _page_company_news(ticker: str, end_date: str, start_date: str | None, limit: int) -> Iterator[tuple[list[CompanyNews], list[dict]]]:
+    """Page through the company news in a date range, newest first, yielding each page's models and JSON objects."""
     current_end_date = end_date
+    pages = 0
     
-    while True:
-        url = f"https://api.financialdatasets.ai/news/?ticker={ticker}&end_date={current_end_date}"
-        if start_date:
-            url += f"&start_date={start_date}"
-        url += f"&limit={limit}"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
-        
-        data = response.json()
-        response_model = CompanyNewsResponse(**data)
-        company_news = response_model.news
-        
-        if not company_news:
-            break
+    try:
+        while True:
+            pages += 1
+            params = {"ticker": ticker, "end_date": current_end_date}
+            if start_date:
+                params["start_date"] = start_date
+            params["limit"] = limit
+
+            response = _request("company_news", "GET", "/news/", params=params, stream=True)
+            if response.status_code != 200:
+                raise APIError(f"Error fetching data: {ticker} - {response.status_code} - {response.text}", response.status_code)
             
-        all_news.extend(company_news)
-        
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(company_news) < limit:
-            break
+            # Each record is validated as the stream yields it, in one pass over the body
+            payloads, company_news = [], []
+            for payload in _stream_records("company_news", response, "news"):
+                payloads.append(payload)
+                company_news.append(CompanyNews.model_validate(payload))
             
-        # Update end_date to the oldest date from current batch for next iteration
-        current_end_date = min(news.date for news in company_news).split('T')[0]
-        
-        # If we've reached or passed the start_date, we can stop
-        if current_end_date <= start_date:
-            break
-
-    if not all_news:
-        return []
-
-    # Cache the results
-    _cache.set_company_news(ticker, [news.model_dump() for news in all_news])
-    return all_news
+            if not company_news:
+                break
+                
+            yield company_news, payloads
+            
+            # Only continue pagination if we have a start_date and got a full page
+            if not start_date or len(company_news) < limit:
+                break
+                
+            # Update end_date to the oldest date from current batch for next iteration
+            current_end_date = min(news.date for news in company_news).split('T')[0]
+            
+            # If we've reached or passed the start_date, we can stop
+            if current_end_date <= start_date:
+                break
+    finally:
+        _metrics.record_pages("company_news", pages)
+
+
+def _stream_records(endpoint: str, response, key: str) -> Iterator[dict]:
+    """
+    Yield the JSON objects in a streamed response's `key` array as they arrive, so a page is
+    never held as one body string on top of its parsed records. Closes the response when done.
+    """
+    nbytes = 0
+
+    def chunks():
+        nonlocal nbytes
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            nbytes += len(chunk)
+            yield chunk
+
+    try:
+        yield from iter_array(chunks(), key)
+    finally:
+        response.close()
+        _metrics.record_bytes(endpoint, nbytes)
+
+
+def _date_windows(start_date: str, end_date: str, window_days: int) -> list[tuple[str, str]]:
+    """Split [start_date, end_date] into consecutive windows of at most window_days days, newest first."""
+    start, end = datetime.date.fromisoformat(start_date[:10]), datetime.date.fromisoformat(end_date[:10])
+    windows = []
+    while end >= start:
+        window_start = max(start, end - datetime.timedelta(days=window_days - 1))
+        windows.append((window_start.isoformat(), end.isoformat()))
+        end = window_start - datetime.timedelta(days=1)
+    return windows
+
+
+def _fetch_windows(endpoint: str, page, store, ticker: str, end_date: str, start_date: str | None, limit: int) -> tuple[int, str | None]:
+    """
+    Fetch a date range with page(ticker, end_date, start_date, limit), handing every page to
+    store(ticker, records, payloads=...) as soon as it is parsed rather than collecting them; callers pin the
+    ticker's entry so those pages aren't evicted before the range is marked synced. Ranges longer than
+    FINANCIAL_DATASETS_WINDOW_DAYS (default 180, 0 disables) are split into windows that are paged
+    concurrently, so a long history takes about one window's round trips instead of one per page.
+    Returns how many records were fetched and the earliest fetch date among them.
+    """
+    fetch_date = FETCH_DATES[endpoint]
+
+    def fetch(window_start: str | None, window_end: str) -> tuple[int, str | None]:
+        count, oldest = 0, None
+        for records, payloads in page(ticker, window_end, window_start, limit):
+            # The cache drops duplicates, e.g. rows repeated where one page ends and the next starts
+            store(ticker, records, payloads=payloads)
+            count += len(records)
+            oldest = min([fetch_date(record) for record in records] + ([oldest] if oldest else []))
+        return count, oldest
+
+    window_days = int(os.environ.get("FINANCIAL_DATASETS_WINDOW_DAYS", DEFAULT_WINDOW_DAYS))
+    windows = _date_windows(start_date, end_date, window_days) if start_date and window_days > 0 else []
+    if len(windows) <= 1:
+        results = [fetch(start_date, end_date)]
+    else:
+        futures = [_get_window_executor().submit(fetch, window_start, window_end) for window_start, window_end in windows]
+        results = [future.result() for future in futures]
+    return sum(count for count, _ in results), min((oldest for _, oldest in results if oldest), default=None)
 
 
 
@@ -255,8 +504,15 @@ def get_market_cap(
     ticker: str,
     end_date: str,
 ) -> float | None:
-    """Fetch market cap from the API."""
-    financial_metrics = get_financial_metrics(ticker, end_date)
+    """Fetch market cap from the latest TTM financial metrics, cached or else from the API."""
+    if (market_cap := _cache.get_market_cap(ticker, end_date)) is not None:
+        _metrics.record_hit("market_cap")
+        return market_cap
+
+    _metrics.record_miss("market_cap")
+    financial_metrics = get_financial_metrics(ticker, end_date, **MARKET_CAP_METRICS)
+    if not financial_metrics:
+        return None
     market_cap = financial_metrics[0].market_cap
     if not market_cap:
         return None
@@ -276,7 +532,9 @@ def prices_to_df(prices: list[Price]) -> pd.DataFrame:
     return df
 
 
-# Update the get_price_data function to use the new functions
 def get_price_data(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-    prices = get_prices(ticker, start_date, end_date)
-    return prices_to_df(prices)
+    """Fetch prices as a Date-indexed DataFrame, served from the columnar price cache. The frame is the caller's to modify."""
+    with _cache.pinned("prices", ticker):
+        _fill_price_gaps(ticker, start_date, end_date)
+        df = _cache.get_price_frame(ticker, start_date, end_date)
+    return df if df is not None else PriceSeries().to_frame()
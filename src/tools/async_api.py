@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, LineItem, Price
+from tools.api import (
+    get_company_news,
+    get_financial_metrics,
+    get_financial_metrics_as_of,
+    get_insider_trades,
+    get_market_cap,
+    get_prices,
+    search_line_items,
+    search_line_items_batch,
+)
+from tools.http_client import get_client
+
+# The synchronous functions in tools.api own the cache and the pooled HTTP client,
+# so each coroutine runs its blocking counterpart on a worker thread. The executor
+# is sized to the connection pool rather than the CPU count, since the work is I/O bound.
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Create the workers on first use, sized to the client's pool after environment variables are loaded."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=get_client().pool_size, thread_name_prefix="api")
+    return _executor
+
+
+async def _to_thread(func: Callable, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def aget_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
+    """Async variant of get_prices."""
+    return await _to_thread(get_prices, ticker, start_date, end_date)
+
+
+async def aget_financial_metrics(ticker: str, end_date: str, period: str = "ttm", limit: int = 10) -> list[FinancialMetrics]:
+    """Async variant of get_financial_metrics."""
+    return await _to_thread(get_financial_metrics, ticker, end_date, period, limit)
+
+
+async def aget_financial_metrics_as_of(ticker: str, as_of_dates: list[str], period: str = "ttm", limit: int = 10) -> dict[str, list[FinancialMetrics]]:
+    """Async variant of get_financial_metrics_as_of."""
+    return await _to_thread(get_financial_metrics_as_of, ticker, as_of_dates, period, limit)
+
+
+async def asearch_line_items(ticker: str, line_items: list[str], end_date: str, period: str = "ttm", limit: int = 10) -> list[LineItem]:
+    """Async variant of search_line_items."""
+    return await _to_thread(search_line_items, ticker, line_items, end_date, period, limit)
+
+
+async def asearch_line_items_batch(tickers: list[str], line_items: list[str], end_date: str, period: str = "ttm", limit: int = 10) -> dict[str, list[LineItem]]:
+    """Async variant of search_line_items_batch."""
+    return await _to_thread(search_line_items_batch, tickers, line_items, end_date, period, limit)
+
+
+async def aget_insider_trades(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000) -> list[InsiderTrade]:
+    """Async variant of get_insider_trades."""
+    return await _to_thread(get_insider_trades, ticker, end_date, start_date, limit)
+
+
+async def aget_company_news(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000) -> list[CompanyNews]:
+    """Async variant of get_company_news."""
+    return await _to_thread(get_company_news, ticker, end_date, start_date, limit)
+
+
+async def aget_market_cap(ticker: str, end_date: str) -> float | None:
+    """Async variant of get_market_cap."""
+    return await _to_thread(get_market_cap, ticker, end_date)
+
+
+async def agather(calls: list[tuple[Callable[..., Awaitable], tuple, dict]], max_concurrency: int | None = None) -> list[Any]:
+    """
+    Run (coroutine_function, args, kwargs) calls concurrently, at most max_concurrency at a time.
+    Results come back in call order; a failed call yields its exception instead of cancelling the rest.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or get_client().pool_size)
+
+    async def run(func: Callable[..., Awaitable], args: tuple, kwargs: dict):
+        async with semaphore:
+            return await func(*args, **kwargs)
+
+    return await asyncio.gather(*(run(func, args, kwargs) for func, args, kwargs in calls), return_exceptions=True)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# FINANCIAL_DATASETS_FIXTURE_MODE values
+RECORD = "record"
+REPLAY = "replay"
+
+
+def request_key(method: str, path: str, params: dict | None = None, json_body: dict | None = None) -> str:
+    """
+    A stable key for a request: its method, path, query parameters and JSON body, independent of
+    the base URL and of parameter order, so a recording replays against any server.
+    """
+    canonical = json.dumps([method.upper(), path, sorted((str(k), str(v)) for k, v in (params or {}).items()), json_body], sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class FixtureStore:
+    """
+    Recorded API responses in a SQLite file, one row per distinct request with its body
+    zlib-compressed. Replayed responses are rebuilt as requests.Response objects.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       request_key TEXT PRIMARY KEY,
+                       method TEXT NOT NULL,
+                       path TEXT NOT NULL,
+                       request TEXT NOT NULL,
+                       status_code INTEGER NOT NULL,
+                       content_type TEXT,
+                       body BLOB NOT NULL,
+                       recorded_at REAL NOT NULL
+                   )"""
+            )
+
+    def save(self, method: str, path: str, params: dict | None, json_body: dict | None, response: requests.Response):
+        """Record a response, replacing any earlier recording of the same request."""
+        row = (
+            request_key(method, path, params, json_body),
+            method.upper(),
+            path,
+            json.dumps({"params": params, "json": json_body}, default=str),
+            response.status_code,
+            response.headers.get("Content-Type"),
+            zlib.compress(response.content),
+            time.time(),
+        )
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def load(self, method: str, path: str, params: dict | None, json_body: dict | None, url: str) -> requests.Response | None:
+        """The recorded response to a request, or None if it wasn't recorded."""
+        with self._lock:
+            row = self._conn.execute("SELECT status_code, content_type, body FROM responses WHERE request_key = ?", (request_key(method, path, params, json_body),)).fetchone()
+        if row is None:
+            return None
+        response = requests.Response()
+        response.status_code = row[0]
+        response.headers = CaseInsensitiveDict({"Content-Type": row[1]} if row[1] else {})
+        response._content = zlib.decompress(row[2])
+        # The body is already read, so iter_content serves it instead of reading a raw stream
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,217 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.fixtures import RECORD, REPLAY, FixtureStore
+from tools.metrics import get_metrics
+from tools.rate_limiter import RateLimiter, SQLiteRateLimiter
+
+DEFAULT_BASE_URL = "https://api.financialdatasets.ai"
+
+# Where recorded responses go when FINANCIAL_DATASETS_FIXTURE_PATH isn't set
+DEFAULT_FIXTURE_PATH = os.path.join("fixtures", "api_fixtures.sqlite3")
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class APIError(Exception):
+    """Raised when the financial datasets API returns a non-200 response or can't be reached."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class HTTPClient:
+    """
+    Thread-safe HTTP client for the financial datasets API.
+    Shares one pooled keep-alive session across threads and retries
+    rate-limited and failed requests with exponential backoff and jitter.
+    An optional rate limiter, shared by every thread and optionally by every process on the
+    machine, queues requests to stay within the API plan's quota instead of running into 429s.
+    In record mode every final response is also saved to a fixture store; in replay
+    mode responses come from that store and the network is never used.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        pool_size: int | None = None,
+        max_retries: int | None = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+        fixture_mode: str | None = None,
+        fixture_path: str | None = None,
+        rate_limit: float | None = None,
+        rate_burst: int | None = None,
+        rate_limit_path: str | None = None,
+    ):
+        """
+        :param base_url: API root. Defaults to FINANCIAL_DATASETS_BASE_URL or the public API.
+        :param pool_size: Max pooled connections. Defaults to FINANCIAL_DATASETS_POOL_SIZE or 20.
+        :param max_retries: Retries after the first attempt. Defaults to FINANCIAL_DATASETS_MAX_RETRIES or 5.
+        :param backoff_base: Delay ceiling, in seconds, of the first retry; doubles on every attempt.
+        :param backoff_max: Upper bound on any single delay, in seconds.
+        :param timeout: Per-request timeout in seconds.
+        :param fixture_mode: "record" or "replay". Defaults to FINANCIAL_DATASETS_FIXTURE_MODE; live requests only if neither is set.
+        :param fixture_path: Fixture store file. Defaults to FINANCIAL_DATASETS_FIXTURE_PATH, then DEFAULT_FIXTURE_PATH.
+        :param rate_limit: Requests per minute, retries included. Defaults to FINANCIAL_DATASETS_RATE_LIMIT; unlimited if neither is set.
+        :param rate_burst: Requests allowed back to back. Defaults to FINANCIAL_DATASETS_RATE_BURST or 1.
+        :param rate_limit_path: SQLite file to share the quota through with other processes.
+            Defaults to FINANCIAL_DATASETS_RATE_LIMIT_PATH; this process only if neither is set.
+        """
+        self._base_url = base_url
+        self._pool_size = pool_size
+        self._max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+
+        self.fixture_mode = fixture_mode
+        self._fixture_path = fixture_path
+        self._fixtures: FixtureStore | None = None
+        self._fixtures_resolved = False
+
+        self._rate_limit = rate_limit
+        self._rate_burst = rate_burst
+        self._rate_limit_path = rate_limit_path
+        self._limiter: RateLimiter | None = None
+        self._limiter_resolved = False
+
+    # Resolved on use rather than in __init__, since the global client is created at import,
+    # before entry points like main.py load .env
+
+    @property
+    def base_url(self) -> str:
+        return (self._base_url or os.environ.get("FINANCIAL_DATASETS_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size or int(os.environ.get("FINANCIAL_DATASETS_POOL_SIZE", 20))
+
+    @property
+    def max_retries(self) -> int:
+        return self._max_retries if self._max_retries is not None else int(os.environ.get("FINANCIAL_DATASETS_MAX_RETRIES", 5))
+
+    def _get_session(self) -> requests.Session:
+        """Create the shared session on first use, after environment variables are loaded."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
+                        session.headers["X-API-KEY"] = api_key
+                    self._session = session
+        return self._session
+
+    def _get_fixtures(self) -> FixtureStore | None:
+        """Open the fixture store on first use if recording or replaying, after environment variables are loaded."""
+        if not self._fixtures_resolved:
+            with self._lock:
+                if not self._fixtures_resolved:
+                    mode = self.fixture_mode or os.environ.get("FINANCIAL_DATASETS_FIXTURE_MODE") or None
+                    if mode not in (None, RECORD, REPLAY):
+                        raise ValueError(f"Unknown fixture mode: {mode}, expected {RECORD!r} or {REPLAY!r}")
+                    if mode:
+                        self._fixtures = FixtureStore(self._fixture_path or os.environ.get("FINANCIAL_DATASETS_FIXTURE_PATH") or DEFAULT_FIXTURE_PATH)
+                    self.fixture_mode = mode
+                    self._fixtures_resolved = True
+        return self._fixtures
+
+    def _get_limiter(self) -> RateLimiter | None:
+        """Create the rate limiter on first use if a limit is set, after environment variables are loaded."""
+        if not self._limiter_resolved:
+            with self._lock:
+                if not self._limiter_resolved:
+                    rate = self._rate_limit or float(os.environ.get("FINANCIAL_DATASETS_RATE_LIMIT") or 0)
+                    if rate > 0:
+                        burst = self._rate_burst or int(os.environ.get("FINANCIAL_DATASETS_RATE_BURST", 1))
+                        if path := self._rate_limit_path or os.environ.get("FINANCIAL_DATASETS_RATE_LIMIT_PATH"):
+                            # Processes share the quota per API, not per file
+                            self._limiter = SQLiteRateLimiter(rate, burst, path, name=self.base_url)
+                        else:
+                            self._limiter = RateLimiter(rate, burst)
+                    self._limiter_resolved = True
+        return self._limiter
+
+    def _backoff(self, attempt: int, response: requests.Response | None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+        if response is not None and (retry_after := response.headers.get("Retry-After")):
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def request(self, method: str, path: str, params: dict | None = None, json: dict | None = None, stream: bool = False) -> requests.Response:
+        """
+        Send a request, retrying on 429/5xx and connection errors.
+        Returns the last response; callers check its status code. Raises APIError if the last attempt couldn't connect.
+        With stream, the body is read as the caller iterates over it, and the caller closes the response.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        fixtures = self._get_fixtures()
+        if self.fixture_mode == REPLAY:
+            if (response := fixtures.load(method, path, params, json, url)) is None:
+                raise APIError(f"No recorded response for {method} {path} - params {params} - body {json} in {fixtures.path}")
+            return response
+
+        session = self._get_session()
+        limiter = self._get_limiter()
+        max_retries = self.max_retries
+
+        for attempt in range(max_retries + 1):
+            if limiter is not None:
+                get_metrics().record_queue_wait(limiter.acquire())
+            try:
+                response = session.request(method, url, params=params, json=json, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt == max_retries:
+                    raise APIError(f"Error fetching data: {method} {url} - {type(error).__name__}: {error}") from error
+                time.sleep(self._backoff(attempt, None))
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                if self.fixture_mode == RECORD:
+                    fixtures.save(method, path, params, json, response)
+                return response
+            # Release the connection of a streamed response that won't be read
+            response.close()
+            time.sleep(self._backoff(attempt, response))
+
+    def get(self, path: str, params: dict | None = None, stream: bool = False) -> requests.Response:
+        return self.request("GET", path, params=params, stream=stream)
+
+    def post(self, path: str, json: dict | None = None) -> requests.Response:
+        return self.request("POST", path, json=json)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._fixtures is not None:
+                self._fixtures.close()
+                self._fixtures = None
+                self._fixtures_resolved = False
+
+
+# Global client instance
+_client = HTTPClient()
+
+
+def get_client() -> HTTPClient:
+    """Get the global HTTP client instance."""
+    return _client
@@ -0,0 +1,53 @@
+import codecs
+import json
+import re
+from typing import Iterable, Iterator
+
+_decoder = json.JSONDecoder()
+
+# Whitespace and the commas between array items
+_SEPARATORS = " \t\n\r,"
+
+
+def iter_array(chunks: Iterable[bytes], key: str) -> Iterator[any]:
+    """
+    Yield the items of the array under `key` in a JSON object that arrives as UTF-8 byte chunks,
+    each as soon as it is complete, so the document is never held whole, as text or as parsed objects.
+    Items are decoded with JSONDecoder.raw_decode; they must be objects or arrays, whose closing
+    bracket shows they are complete. Keys after the array are not read.
+    """
+    chunks = iter(chunks)
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos = "", 0
+
+    def read() -> bool:
+        """Append the next chunk to what is left of the buffer; False once the stream is exhausted."""
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        buffer = buffer[pos:] + utf8.decode(chunk or b"", final=chunk is None)
+        pos = 0
+        return chunk is not None
+
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    while (match := start.search(buffer)) is None:
+        if not read():
+            raise ValueError(f"No {key!r} array in response")
+    pos = match.end()
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos == len(buffer):
+            if not read():
+                raise ValueError(f"Truncated {key!r} array in response")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, pos = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item continues in the next chunk
+            if not read():
+                raise
+            continue
+        yield item
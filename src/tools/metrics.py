@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the rate limiter queue wait buckets, in seconds
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upper bounds of the pagination depth buckets, in pages per fetch
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+
+
+class Histogram:
+    """Counts of observations per bucket, with their count, sum and max."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict[str, any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "sum": self.sum, "mean": self.sum / self.count if self.count else 0.0, "max": self.max, "buckets": buckets}
+
+
+class EndpointStats:
+    """Counters for one API endpoint."""
+
+    def __init__(self):
+        # Lookups answered from cache, sent to the API, and answered by a remembered empty result
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        # Network requests, those that didn't return 200, and response body bytes
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.pages = Histogram(PAGE_BUCKETS)
+
+    def to_dict(self) -> dict[str, any]:
+        lookups = self.hits + self.misses + self.negative_hits
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "latency": self.latency.to_dict(),
+            "pages": self.pages.to_dict(),
+        }
+
+
+class Metrics:
+    """
+    Per-endpoint cache and network counters for tools.api, shared across threads.
+    When FINANCIAL_DATASETS_METRICS_INTERVAL (seconds) is set, a snapshot is dumped that often:
+    to FINANCIAL_DATASETS_METRICS_FILE as JSON if set, otherwise to this module's logger.
+    """
+
+    def __init__(self):
+        # Reentrant so the dumper can be started from within a record_* call
+        self._lock = threading.RLock()
+        self._stats: dict[str, EndpointStats] = {}
+        # Time requests spent queued behind the client's rate limiter, across endpoints
+        self._queue_wait = Histogram(WAIT_BUCKETS)
+        self._started_at = time.time()
+        self._dumper: threading.Thread | None = None
+        self._dumper_resolved = False
+
+    def _endpoint(self, endpoint: str) -> EndpointStats:
+        if not self._dumper_resolved:
+            self._start_dumper_from_env()
+        if (stats := self._stats.get(endpoint)) is None:
+            stats = self._stats[endpoint] = EndpointStats()
+        return stats
+
+    def record_hit(self, endpoint: str):
+        with self._lock:
+            self._endpoint(endpoint).hits += 1
+
+    def record_miss(self, endpoint: str):
+        with self._lock:
+            self._endpoint(endpoint).misses += 1
+
+    def record_negative_hit(self, endpoint: str):
+        with self._lock:
+            self._endpoint(endpoint).negative_hits += 1
+
+    def record_request(self, endpoint: str, seconds: float, nbytes: int, status_code: int):
+        """Record one network request: its latency, including retries, body size and final status."""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.requests += 1
+            stats.errors += status_code != 200
+            stats.bytes += nbytes
+            stats.latency.observe(seconds)
+
+    def record_bytes(self, endpoint: str, nbytes: int):
+        """Record body bytes of a streamed response, read after its request was recorded."""
+        with self._lock:
+            self._endpoint(endpoint).bytes += nbytes
+
+    def record_pages(self, endpoint: str, pages: int):
+        """Record how many pages one paginated fetch took."""
+        with self._lock:
+            self._endpoint(endpoint).pages.observe(pages)
+
+    def record_queue_wait(self, seconds: float):
+        """Record how long one request waited for the rate limiter."""
+        with self._lock:
+            if not self._dumper_resolved:
+                self._start_dumper_from_env()
+            self._queue_wait.observe(seconds)
+
+    def snapshot(self) -> dict[str, any]:
+        """All counters as a JSON-serializable dict."""
+        with self._lock:
+            endpoints = {endpoint: stats.to_dict() for endpoint, stats in sorted(self._stats.items())}
+            return {"since": self._started_at, "at": time.time(), "endpoints": endpoints, "queue_wait": self._queue_wait.to_dict()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._queue_wait = Histogram(WAIT_BUCKETS)
+            self._started_at = time.time()
+
+    def dump(self, path: str | None = None):
+        """Write a snapshot as JSON to path, replacing it atomically, or log it if no path is given."""
+        snapshot = json.dumps(self.snapshot())
+        if path is None:
+            logger.info("api metrics: %s", snapshot)
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, path)
+
+    def start_dumper(self, interval: float, path: str | None = None):
+        """Dump a snapshot every interval seconds from a daemon thread."""
+        with self._lock:
+            self._dumper_resolved = True
+            if self._dumper is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.dump(path)
+                    except OSError as e:
+                        logger.warning("Could not dump api metrics: %s", e)
+
+            self._dumper = threading.Thread(target=run, name="api-metrics", daemon=True)
+            self._dumper.start()
+
+    def _start_dumper_from_env(self):
+        """Start the periodic dump on first use if configured, so environment variables loaded after import apply."""
+        self._dumper_resolved = True
+        if interval := os.environ.get("FINANCIAL_DATASETS_METRICS_INTERVAL"):
+            self.start_dumper(float(interval), os.environ.get("FINANCIAL_DATASETS_METRICS_FILE"))
+
+
+# Global metrics instance
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Get the global metrics instance."""
+    return _metrics
@@ -0,0 +1,118 @@
+import asyncio
+
+from agents.risk_manager import DATA_REQUIREMENTS as risk_manager_requirements
+from tools.api import MARKET_CAP_METRICS
+from tools.async_api import (
+    agather,
+    aget_company_news,
+    aget_financial_metrics,
+    aget_financial_metrics_as_of,
+    aget_insider_trades,
+    aget_market_cap,
+    aget_prices,
+    asearch_line_items_batch,
+)
+from utils.analysts import ANALYST_CONFIG
+
+
+def merge_requirements(analysts: list[str] | None = None) -> dict[str, any]:
+    """
+    Merge the DATA_REQUIREMENTS of the selected analysts (all of them if none are given) and of the
+    risk manager, which runs in every graph. Overlapping requests collapse into the largest one:
+    one metrics request and one line item request per period, with the union of line items.
+    Market caps bring the TTM metrics they are read from, so they never wait on a fetch of their own.
+    """
+    requirements = [ANALYST_CONFIG[analyst]["data_requirements"] for analyst in (analysts or ANALYST_CONFIG)]
+    requirements.append(risk_manager_requirements)
+    if any("market_cap" in requirement for requirement in requirements):
+        requirements.append({"financial_metrics": MARKET_CAP_METRICS})
+
+    merged = {"prices": False, "financial_metrics": {}, "line_items": {}, "market_cap": False, "insider_trades": None, "company_news": None}
+    for requirement in requirements:
+        if "prices" in requirement:
+            merged["prices"] = True
+        if "market_cap" in requirement:
+            merged["market_cap"] = True
+        if metrics := requirement.get("financial_metrics"):
+            period = metrics["period"]
+            merged["financial_metrics"][period] = max(merged["financial_metrics"].get(period, 0), metrics["limit"])
+        if line_items := requirement.get("line_items"):
+            planned = merged["line_items"].setdefault(line_items["period"], {"line_items": [], "limit": 0})
+            planned["line_items"] += [line_item for line_item in line_items["line_items"] if line_item not in planned["line_items"]]
+            planned["limit"] = max(planned["limit"], line_items["limit"])
+        for endpoint in ("insider_trades", "company_news"):
+            if endpoint in requirement:
+                merged[endpoint] = max(merged[endpoint] or 0, requirement[endpoint]["limit"])
+    return merged
+
+
+def plan_requests(tickers: list[str], analysts: list[str] | None, start_date: str, end_date: str, as_of_start_date: str | None = None) -> list[dict[str, any]]:
+    """
+    Turn the merged requirements into the minimal set of requests for the given tickers.
+    Each request is {"endpoint", "tickers", "params"}; line items are one batched request per period.
+    With as_of_start_date, financial metrics are planned for every as-of date from then to end_date, for backtests.
+    """
+    merged = merge_requirements(analysts)
+    plan = []
+    if merged["prices"]:
+        plan += [{"endpoint": "prices", "tickers": [ticker], "params": {"start_date": start_date, "end_date": end_date}} for ticker in tickers]
+    for period, limit in merged["financial_metrics"].items():
+        params = {"end_date": end_date, "period": period, "limit": limit, "as_of_start_date": as_of_start_date}
+        plan += [{"endpoint": "financial_metrics", "tickers": [ticker], "params": params} for ticker in tickers]
+    for period, line_items in merged["line_items"].items():
+        plan.append({"endpoint": "line_items", "tickers": list(tickers), "params": {"end_date": end_date, "period": period, **line_items}})
+    for endpoint in ("insider_trades", "company_news"):
+        if merged[endpoint]:
+            plan += [{"endpoint": endpoint, "tickers": [ticker], "params": {"end_date": end_date, "limit": merged[endpoint]}} for ticker in tickers]
+    if merged["market_cap"]:
+        plan += [{"endpoint": "market_cap", "tickers": [ticker], "params": {"end_date": end_date}} for ticker in tickers]
+    return plan
+
+
+def _to_call(request: dict[str, any]) -> tuple:
+    """The (coroutine_function, args, kwargs) call that carries out a planned request."""
+    endpoint, tickers, params = request["endpoint"], request["tickers"], request["params"]
+    if endpoint == "prices":
+        return aget_prices, (tickers[0], params["start_date"], params["end_date"]), {}
+    if endpoint == "financial_metrics":
+        if params["as_of_start_date"]:
+            return aget_financial_metrics_as_of, (tickers[0], [params["as_of_start_date"], params["end_date"]]), {"period": params["period"], "limit": params["limit"]}
+        return aget_financial_metrics, (tickers[0], params["end_date"]), {"period": params["period"], "limit": params["limit"]}
+    if endpoint == "line_items":
+        return asearch_line_items_batch, (tickers, params["line_items"], params["end_date"]), {"period": params["period"], "limit": params["limit"]}
+    if endpoint == "insider_trades":
+        return aget_insider_trades, (tickers[0], params["end_date"]), {"limit": params["limit"]}
+    if endpoint == "company_news":
+        return aget_company_news, (tickers[0], params["end_date"]), {"limit": params["limit"]}
+    if endpoint == "market_cap":
+        return aget_market_cap, (tickers[0], params["end_date"]), {}
+    raise ValueError(f"Unknown endpoint in plan: {endpoint}")
+
+
+async def aexecute_plan(plan: list[dict[str, any]], max_concurrency: int | None = None) -> dict[str, dict[str, any]]:
+    """
+    Run a plan concurrently. Market caps run last since they are derived from the fetched metrics.
+    Returns {ticker: {label: result or exception}}, labelled by endpoint and, where it applies, period.
+    """
+    results: dict[str, dict[str, any]] = {}
+    for phase in ([request for request in plan if request["endpoint"] != "market_cap"], [request for request in plan if request["endpoint"] == "market_cap"]):
+        outcomes = await agather([_to_call(request) for request in phase], max_concurrency=max_concurrency)
+        for request, outcome in zip(phase, outcomes):
+            params = request["params"]
+            label = f"{request['endpoint']}:{params['period']}" if "period" in params else request["endpoint"]
+            for ticker in request["tickers"]:
+                if isinstance(outcome, Exception):
+                    result = outcome
+                elif request["endpoint"] == "line_items":
+                    result = outcome[ticker]
+                elif request["endpoint"] == "financial_metrics" and params["as_of_start_date"]:
+                    result = outcome[params["end_date"]]
+                else:
+                    result = outcome
+                results.setdefault(ticker, {})[label] = result
+    return results
+
+
+def prefetch_plan(plan: list[dict[str, any]], max_concurrency: int | None = None) -> dict[str, dict[str, any]]:
+    """Blocking entry point for aexecute_plan, for callers outside an event loop."""
+    return asyncio.run(aexecute_plan(plan, max_concurrency=max_concurrency))
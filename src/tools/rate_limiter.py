@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces requests to at most `rate` per minute across every thread that shares the limiter,
+    allowing bursts of up to `burst`. Callers queue instead of failing: each acquire() reserves
+    the next free slot (the generic cell rate algorithm) and sleeps until it comes round, so
+    waiting requests go out evenly spaced, in the order they arrived.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: Requests per minute.
+        :param burst: Requests allowed back to back before spacing kicks in.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.interval = 60 / rate
+        self._lock = threading.Lock()
+        # Theoretical arrival time: when the schedule frees up if no burst capacity is used
+        self._tat = 0.0
+
+    def _reserve(self, tat: float, now: float) -> tuple[float, float]:
+        """The wait before a request arriving at now may go out, and the schedule after it."""
+        tat = max(tat, now)
+        wait = max(0.0, tat - (self.burst - 1) * self.interval - now)
+        return wait, tat + self.interval
+
+    def _take(self) -> float:
+        with self._lock:
+            wait, self._tat = self._reserve(self._tat, time.monotonic())
+        return wait
+
+    def acquire(self) -> float:
+        """Block until a request may be sent, and return how many seconds that took."""
+        wait = self._take()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    A RateLimiter whose schedule lives in a SQLite file, so every process on a machine that
+    points at the same file, e.g. several web workers, shares one quota.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, path: str = "rate_limit.sqlite3", name: str = "default"):
+        """
+        :param path: SQLite file holding the schedule, created along with its directory if missing.
+        :param name: The quota within the file; limiters with the same name share it.
+        """
+        super().__init__(rate, burst)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.name = name
+        self._pid: int | None = None
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        The connection for this process, opened on first use and again after a fork, since
+        SQLite connections must not cross into a child process. Callers hold the lock.
+        """
+        if self._pid == os.getpid():
+            return self._conn
+        self._pid = os.getpid()
+        # Autocommit, so the transaction below is exactly the one BEGIN IMMEDIATE opens
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, tat REAL NOT NULL)")
+        return self._conn
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                # A forked child inherits the parent's lock, possibly held by a thread that didn't survive the fork
+                self._lock = threading.Lock()
+            with self._lock:
+                self._connect()
+        return self._conn
+
+    def _take(self) -> float:
+        conn = self._connection()
+        with self._lock:
+            # Wall-clock time, since the schedule is compared across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tat FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+                wait, tat = self._reserve(row[0] if row else 0.0, time.time())
+                conn.execute("INSERT OR REPLACE INTO rate_limits VALUES (?, ?)", (self.name, tat))
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return wait
@@ -1,60 +1,69 @@
 """Constants and utilities related to analysts configuration."""
 
-from agents.ben_graham import ben_graham_agent
-from agents.bill_ackman import bill_ackman_agent
-from agents.cathie_wood import cathie_wood_agent
-from agents.charlie_munger import charlie_munger_agent
-from agents.fundamentals import fundamentals_agent
-from agents.sentiment import sentiment_agent
-from agents.technicals import technical_analyst_agent
-from agents.valuation import valuation_agent
-from agents.warren_buffett import warren_buffett_agent
+from agents.ben_graham import ben_graham_agent, DATA_REQUIREMENTS as ben_graham_requirements
+from agents.bill_ackman import bill_ackman_agent, DATA_REQUIREMENTS as bill_ackman_requirements
+from agents.cathie_wood import cathie_wood_agent, DATA_REQUIREMENTS as cathie_wood_requirements
+from agents.charlie_munger import charlie_munger_agent, DATA_REQUIREMENTS as charlie_munger_requirements
+from agents.fundamentals import fundamentals_agent, DATA_REQUIREMENTS as fundamentals_requirements
+from agents.sentiment import sentiment_agent, DATA_REQUIREMENTS as sentiment_requirements
+from agents.technicals import technical_analyst_agent, DATA_REQUIREMENTS as technicals_requirements
+from agents.valuation import valuation_agent, DATA_REQUIREMENTS as valuation_requirements
+from agents.warren_buffett import warren_buffett_agent, DATA_REQUIREMENTS as warren_buffett_requirements
 
 # Define analyst configuration - single source of truth
 ANALYST_CONFIG = {
     "ben_graham": {
         "display_name": "Ben Graham",
         "agent_func": ben_graham_agent,
+        "data_requirements": ben_graham_requirements,
         "order": 0,
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
         "agent_func": bill_ackman_agent,
+        "data_requirements": bill_ackman_requirements,
         "order": 1,
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
         "agent_func": cathie_wood_agent,
+        "data_requirements": cathie_wood_requirements,
         "order": 2,
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
         "agent_func": charlie_munger_agent,
+        "data_requirements": charlie_munger_requirements,
         "order": 3,
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
         "agent_func": warren_buffett_agent,
+        "data_requirements": warren_buffett_requirements,
         "order": 4,
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
         "agent_func": technical_analyst_agent,
+        "data_requirements": technicals_requirements,
         "order": 4,
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
         "agent_func": fundamentals_agent,
+        "data_requirements": fundamentals_requirements,
         "order": 5,
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
         "agent_func": sentiment_agent,
+        "data_requirements": sentiment_requirements,
         "order": 6,
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
         "agent_func": valuation_agent,
+        "data_requirements": valuation_requirements,
         "order": 7,
     },
 }
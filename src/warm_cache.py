@@ -0,0 +1,133 @@
+"""
+Warm the data cache before a run: fetch everything the selected analysts need for a ticker universe
+and date range into the persistent cache, in parallel, so the main.py runs, Flask endpoints and
+backtests that follow start hot. Run from src/ with FINANCIAL_DATASETS_CACHE_DIR set, e.g. in .env:
+
+    python warm_cache.py --tickers-file tickers.txt [--start-date 2024-01-01] [--end-date 2024-12-31] [--analysts ben_graham,sentiment_analyst]
+
+Exits with status 1 if any request failed, so a scheduled warm-up can alert on it.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from dotenv import load_dotenv
+
+# Load environment variables from .env file before the cache and client read their settings
+load_dotenv()
+
+from data.cache import get_cache
+from tools.metrics import get_metrics
+from tools.planner import plan_requests, prefetch_plan
+from utils.analysts import ANALYST_CONFIG
+
+
+def read_tickers(path: str) -> list[str]:
+    """Tickers from a file, one per line or comma-separated; blank lines and # comments are skipped, duplicates dropped."""
+    tickers = []
+    with open(path) as file:
+        for line in file:
+            for ticker in line.split("#", 1)[0].split(","):
+                ticker = ticker.strip().upper()
+                if ticker and ticker not in tickers:
+                    tickers.append(ticker)
+    return tickers
+
+
+def parse_date(value: str) -> str:
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a YYYY-MM-DD date")
+    return value
+
+
+def warm_cache(tickers: list[str], start_date: str, end_date: str, analysts: list[str] | None = None, as_of_start_date: str | None = None, max_concurrency: int | None = None) -> dict[str, any]:
+    """
+    Plan and prefetch the requests the analysts (all of them if none are given) make for the tickers.
+    Returns the plan size, elapsed seconds, the failures as {ticker: {label: exception}}, and the
+    metrics snapshot and cache footprint after the run.
+    """
+    plan = plan_requests(tickers, analysts, start_date, end_date, as_of_start_date=as_of_start_date)
+    get_metrics().reset()
+    started = time.perf_counter()
+    results = prefetch_plan(plan, max_concurrency=max_concurrency)
+    elapsed = time.perf_counter() - started
+
+    failures = {}
+    for ticker, outcomes in results.items():
+        for label, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                failures.setdefault(ticker, {})[label] = outcome
+    return {"requests": len(plan), "elapsed": elapsed, "failures": failures, "metrics": get_metrics().snapshot(), "footprint": get_cache().footprint()}
+
+
+def print_report(report: dict[str, any], tickers: list[str]):
+    elapsed = report["elapsed"]
+    failed = sum(len(labels) for labels in report["failures"].values())
+    print(
+        f"Warmed {len(tickers)} tickers with {report['requests']} planned requests in {elapsed:.2f} s"
+        f" ({report['requests'] / elapsed:,.1f} requests/s, {len(tickers) / elapsed:,.1f} tickers/s), {failed} failed"
+    )
+
+    print("Network:")
+    for endpoint, stats in report["metrics"]["endpoints"].items():
+        latency = stats["latency"]
+        mean = f"mean {latency['mean'] * 1000:.1f} ms" if latency["count"] else "no requests"
+        print(
+            f"  {endpoint:>17}: {stats['hits']:5} hits {stats['misses']:5} misses {stats['negative_hits']:4} negative"
+            f" | {stats['requests']:5} requests, {stats['errors']} errors, {stats['bytes'] / 2**20:.1f} MiB, {mean}"
+        )
+    if (queue_wait := report["metrics"]["queue_wait"])["count"]:
+        print(f"  rate limiter: mean wait {queue_wait['mean'] * 1000:.1f} ms, max {queue_wait['max'] * 1000:.1f} ms")
+
+    print("Cache footprint in memory:")
+    for endpoint, held in report["footprint"].items():
+        budget = f" of {held['max_bytes'] / 2**20:.0f} MiB" if held["max_bytes"] else ""
+        print(f"  {endpoint:>17}: {held['entries']:5} entries, {held['rows']:8} rows, {held['bytes'] / 2**20:.1f} MiB{budget}")
+    if cache_dir := os.environ.get("FINANCIAL_DATASETS_CACHE_DIR"):
+        path = os.path.join(cache_dir, "api_cache.sqlite3")
+        # Recent writes sit in the write-ahead log until SQLite checkpoints them into the file
+        size = sum(os.path.getsize(file) for file in (path, path + "-wal") if os.path.exists(file))
+        print(f"Persistent cache: {path}, {size / 2**20:.1f} MiB")
+
+    for ticker, labels in report["failures"].items():
+        for label, error in labels.items():
+            print(f"  failed: {ticker} {label}: {type(error).__name__}: {str(error)[:160]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefetch the data a run will need into the persistent cache")
+    parser.add_argument("--tickers-file", required=True, help="File of ticker symbols, one per line or comma-separated")
+    parser.add_argument("--start-date", type=parse_date, help="Start date (YYYY-MM-DD). Defaults to 3 months before end date")
+    parser.add_argument("--end-date", type=parse_date, help="End date (YYYY-MM-DD). Defaults to today")
+    parser.add_argument("--analysts", help=f"Comma-separated analysts to prefetch for, from: {', '.join(ANALYST_CONFIG)}. Defaults to all")
+    parser.add_argument("--as-of-start-date", type=parse_date, help="Also prefetch financial metrics as of every date from here to the end date, for backtests")
+    parser.add_argument("--concurrency", type=int, default=None, help="Requests in flight at once. Defaults to FINANCIAL_DATASETS_POOL_SIZE")
+    args = parser.parse_args()
+
+    tickers = read_tickers(args.tickers_file)
+    if not tickers:
+        parser.error(f"No tickers in {args.tickers_file}")
+
+    analysts = None
+    if args.analysts:
+        analysts = [analyst.strip() for analyst in args.analysts.split(",") if analyst.strip()]
+        if unknown := [analyst for analyst in analysts if analyst not in ANALYST_CONFIG]:
+            parser.error(f"Unknown analysts: {', '.join(unknown)}")
+
+    # Same defaults as main.py
+    end_date = args.end_date or datetime.now().strftime("%Y-%m-%d")
+    start_date = args.start_date or (datetime.strptime(end_date, "%Y-%m-%d") - relativedelta(months=3)).strftime("%Y-%m-%d")
+
+    if not os.environ.get("FINANCIAL_DATASETS_CACHE_DIR"):
+        print("FINANCIAL_DATASETS_CACHE_DIR is not set, so the cache is memory only and this warm-up is lost on exit")
+
+    print(f"Prefetching {start_date} to {end_date} for {len(tickers)} tickers, analysts: {', '.join(analysts or ANALYST_CONFIG)}")
+    report = warm_cache(tickers, start_date, end_date, analysts, as_of_start_date=args.as_of_start_date, max_concurrency=args.concurrency)
+    print_report(report, tickers)
+    sys.exit(1 if report["failures"] else 0)